@@ -0,0 +1,5 @@
+"""
+Command-line entry point for the repository scripts: `python -m dma <command>`.
+Only the standard library is imported here; each command's script imports
+the heavy packages it needs when it runs.
+"""
@@ -0,0 +1,111 @@
+"""
+python -m dma <command> [args...]
+
+Runs one of the repository scripts as if it were started directly, passing the
+remaining arguments through. With --importtime the command is re-run under
+`python -X importtime` and the import cost per top-level package is summarised
+on stderr.
+"""
+
+import argparse
+import os
+import re
+import runpy
+import subprocess
+import sys
+import time
+
+repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+scripts_dir = os.path.join(repo_root, 'scripts')
+
+# command -> (script under scripts/, help)
+COMMANDS = {
+    'lab': ('experiments/weka_lab.py', 'Weka lab replication, 10-fold CV grid'),
+    'seed-sweep': ('experiments/seed_sweep.py', 'seed sweep with CI-based early stopping'),
+    'rf-variation': ('experiments/rf_variation_quick.py', 'RandomForest seed variation and tree curve'),
+    'search': ('experiments/halving_search.py', 'successive halving / Hyperband over the classifiers'),
+    'bench': ('experiments/pipeline_benchmark.py', 'time every pipeline stage over synthetic data sizes'),
+    'mdl-bench': ('experiments/discretizer_benchmark.py', 'MDL vs quantile discretization fit time and accuracy'),
+    'flat-trees': ('experiments/flat_trees.py', 'flattened J48/RandomForest predictor vs sklearn'),
+    'compare': ('experiments/complete_comparison.py', 'full comparison against the Weka reference'),
+    'compare-weka': ('experiments/compare_weka_results.py', 'lab results vs Weka reference'),
+    'compare-results': ('experiments/compare_results.py', 'lab results vs reference CSV'),
+    'significance': ('experiments/significance.py', 'corrected resampled t-tests over all classifier pairs'),
+    'ilpd': ('experiments/ilpd_pipeline.py', 'ILPD LR vs RF with cached per-fold preprocessing'),
+    'confirm-rf': ('experiments/confirm_randomforest.py', 'confirm the RandomForest numbers'),
+    'iris-stats': ('analysis/iris_stats.py', 'iris summary statistics'),
+    'mpg-stats': ('analysis/auto_mpg_stats_v2.py', 'auto-mpg averages by cylinders'),
+    'iris-plots': ('analysis/iris_plots.py', 'iris figures'),
+    'mpg-plots': ('analysis/auto_mpg_plots.py', 'auto-mpg figures'),
+    'serve': ('utils/inference_server.py', 'micro-batching HTTP server for exported models'),
+    'convert-arff': ('utils/convert_arff_to_csv.py', 'convert diabetes.arff to CSV'),
+    'fetch-iris': ('utils/fetch_iris.py', 'download the iris dataset'),
+}
+
+IMPORT_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \| \s*(\S+)')
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m dma', description='Run a repository script.')
+    parser.add_argument('--importtime', action='store_true',
+                        help='report where the command spends its import time')
+    parser.add_argument('--top', type=int, default=15, help='packages listed by --importtime')
+    sub = parser.add_subparsers(dest='command', metavar='command', required=True)
+    for name, (_, help_text) in COMMANDS.items():
+        sub.add_parser(name, help=help_text, add_help=False)
+    return parser.parse_known_args(argv)
+
+
+def run_script(command, args):
+    path = os.path.join(scripts_dir, COMMANDS[command][0])
+    # scripts import their siblings (lab_engine, group_stats, ...) from their own directory
+    sys.path.insert(0, os.path.dirname(path))
+    sys.argv = [path] + list(args)
+    runpy.run_path(path, run_name='__main__')
+
+
+def summarize_importtime(stderr, top):
+    """
+    Sum the self time of every imported module per top-level package, so e.g.
+    pandas is charged for pandas.* even when it was pulled in by another
+    module. Returns ([(package, us, n_modules)], total_us).
+    """
+    per_package = {}
+    total = 0
+    for line in stderr.splitlines():
+        m = IMPORT_LINE.match(line)
+        if not m:
+            continue
+        self_us = int(m.group(1))
+        package = m.group(3).split('.')[0]
+        us, count = per_package.get(package, (0, 0))
+        per_package[package] = (us + self_us, count + 1)
+        total += self_us
+    rows = sorted(((p, us, n) for p, (us, n) in per_package.items()), key=lambda r: r[1], reverse=True)
+    return rows[:top], total
+
+
+def run_with_importtime(command, args, top):
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-m', 'dma', command] + list(args),
+                          cwd=repo_root, stderr=subprocess.PIPE, text=True)
+    elapsed = time.perf_counter() - start
+    rows, total = summarize_importtime(proc.stderr, top)
+    other = [line for line in proc.stderr.splitlines() if not line.startswith('import time:')]
+    if other:
+        print('\n'.join(other), file=sys.stderr)
+    print(f'\nImport time for `{command}`: {total / 1e6:.3f}s of {elapsed:.3f}s wall', file=sys.stderr)
+    for package, us, n_modules in rows:
+        print(f'  {us / 1e3:9.1f} ms  {package} ({n_modules} modules)', file=sys.stderr)
+    return proc.returncode
+
+
+def main(argv=None):
+    args, rest = parse_args(argv)
+    if args.importtime:
+        sys.exit(run_with_importtime(args.command, rest, args.top))
+    run_script(args.command, rest)
+
+
+if __name__ == '__main__':
+    main()
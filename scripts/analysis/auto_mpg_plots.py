@@ -1,66 +1,70 @@
+import argparse
 import os
-import pandas as pd
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
-import seaborn as sns
+import sys
 
-sns.set(style='whitegrid')
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'utils'))
+from dataset_cache import load_dataset
+from plot_pipeline import DENSITY_ROWS, FigureJob, render_all, report, scatter_by_hue
 
-def main():
+# Render functions run in pool workers; matplotlib/seaborn are imported there only.
+
+def bar_by_cylinders(data, color, ylabel, title):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    sns.set(style='whitegrid')
+    fig, ax = plt.subplots(figsize=(6,4))
+    data.plot(kind='bar', color=color, ax=ax)
+    ax.set_xlabel('Cylinders')
+    ax.set_ylabel(ylabel)
+    ax.set_title(title)
+    plt.tight_layout()
+    return fig
+
+def mpg_scatter(data, density_rows=DENSITY_ROWS):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    sns.set(style='whitegrid')
+    fig, ax = plt.subplots(figsize=(6,5))
+    scatter_by_hue(ax, data, 'horsepower', 'mpg', 'cylinders', palette='tab10', density_rows=density_rows)
+    ax.set_title('MPG vs Horsepower (colored by cylinders)')
+    plt.tight_layout()
+    return fig
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Auto MPG report figures')
+    parser.add_argument('--n-jobs', type=int, default=None, help='render processes (default: all cores)')
+    parser.add_argument('--density-rows', type=int, default=DENSITY_ROWS,
+                        help='draw scatter plots as a density raster above this many rows')
+    parser.add_argument('--force', action='store_true', help='redraw every figure even if unchanged')
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
     repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
     data_path = os.path.join(repo_root, 'data', 'raw', 'auto-mpg.tab')
     results_dir = os.path.join(repo_root, 'results')
-    os.makedirs(results_dir, exist_ok=True)
 
-    df = pd.read_csv(data_path, sep='\t', header=0, skiprows=[1], na_values='?')
-    df['horsepower'] = pd.to_numeric(df['horsepower'], errors='coerce')
-    df['mpg'] = pd.to_numeric(df['mpg'], errors='coerce')
+    df = load_dataset(data_path)
     print('Read df shape:', df.shape)
     print('Results dir:', results_dir)
 
-    grouped = df.groupby('cylinders')
+    grouped = df.groupby('cylinders', observed=True)
     avg_hp = grouped['horsepower'].mean()
     avg_mpg = grouped['mpg'].mean()
 
-    # Bar plot: average horsepower by cylinders
-    fig, ax = plt.subplots(figsize=(6,4))
-    avg_hp.plot(kind='bar', color='C1', ax=ax)
-    ax.set_xlabel('Cylinders')
-    ax.set_ylabel('Average Horsepower')
-    ax.set_title('Average Horsepower by Cylinder Count')
-    plt.tight_layout()
-    hp_path = os.path.join(results_dir, 'avg_horsepower_by_cylinders.png')
-    fig.savefig(hp_path)
-    plt.close(fig)
-    print('Saved hp plot to', hp_path)
-
-    # Bar plot: average mpg by cylinders
-    fig, ax = plt.subplots(figsize=(6,4))
-    avg_mpg.plot(kind='bar', color='C2', ax=ax)
-    ax.set_xlabel('Cylinders')
-    ax.set_ylabel('Average MPG')
-    ax.set_title('Average MPG by Cylinder Count')
-    plt.tight_layout()
-    mpg_path = os.path.join(results_dir, 'avg_mpg_by_cylinders.png')
-    fig.savefig(mpg_path)
-    plt.close(fig)
-    print('Saved mpg plot to', mpg_path)
-
-    # Scatter: mpg vs horsepower with cylinder hue
-    fig, ax = plt.subplots(figsize=(6,5))
-    sns.scatterplot(data=df, x='horsepower', y='mpg', hue='cylinders', palette='tab10', ax=ax)
-    ax.set_title('MPG vs Horsepower (colored by cylinders)')
-    plt.tight_layout()
-    scatter_path = os.path.join(results_dir, 'mpg_vs_horsepower.png')
-    fig.savefig(scatter_path)
-    plt.close(fig)
-    print('Saved scatter plot to', scatter_path)
-
-    print('Saved plots:')
-    print(hp_path)
-    print(mpg_path)
-    print(scatter_path)
+    jobs = [
+        # Bar plot: average horsepower by cylinders
+        FigureJob(os.path.join(results_dir, 'avg_horsepower_by_cylinders.png'), bar_by_cylinders, avg_hp,
+                  {'color': 'C1', 'ylabel': 'Average Horsepower', 'title': 'Average Horsepower by Cylinder Count'}),
+        # Bar plot: average mpg by cylinders
+        FigureJob(os.path.join(results_dir, 'avg_mpg_by_cylinders.png'), bar_by_cylinders, avg_mpg,
+                  {'color': 'C2', 'ylabel': 'Average MPG', 'title': 'Average MPG by Cylinder Count'}),
+        # Scatter: mpg vs horsepower with cylinder hue
+        FigureJob(os.path.join(results_dir, 'mpg_vs_horsepower.png'), mpg_scatter,
+                  df[['horsepower', 'mpg', 'cylinders']], {'density_rows': args.density_rows}),
+    ]
+    results = render_all(jobs, os.path.join(results_dir, 'cache'), n_jobs=args.n_jobs, force=args.force)
+    report(results)
 
 if __name__ == '__main__':
     main()
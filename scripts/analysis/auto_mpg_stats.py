@@ -1,19 +1,23 @@
 import os
-import pandas as pd
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'utils'))
+from dataset_cache import load_dataset
+from group_stats import Stat, compute
 
 def main():
     repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
     data_path = os.path.join(repo_root, 'data', 'raw', 'auto-mpg.tab')
-    
-    cols = ['mpg','cylinders','displacement','horsepower','weight','acceleration','model_year','origin','car_name']
-    df = pd.read_csv(data_path, sep='\t', names=cols, comment='#', na_values='?')
-    # Convert horsepower to numeric (some ? values may exist)
-    df['horsepower'] = pd.to_numeric(df['horsepower'], errors='coerce')
 
-    # Group by cylinders
-    grouped = df.groupby('cylinders')
-    avg_hp = grouped['horsepower'].mean()
-    avg_mpg = grouped['mpg'].mean()
+    # Typed columns ('?' horsepower -> NaN) come straight from the dataset cache
+    df = load_dataset(data_path)
+
+    # Group by cylinders (one factorization shared by both means)
+    hp = Stat('cylinders', 'horsepower', 'mean')
+    mpg = Stat('cylinders', 'mpg', 'mean')
+    res = compute(df, [hp, mpg])
+    avg_hp = res[hp]
+    avg_mpg = res[mpg]
 
     best_hp_cyl = avg_hp.idxmax()
     best_mpg_cyl = avg_mpg.idxmax()
@@ -1,18 +1,32 @@
+import argparse
 import os
-import pandas as pd
+import sys
 
-def main():
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'utils'))
+from dataset_cache import load_dataset
+from group_stats import Stat, compute, stream_compute
+from tab_reader import iter_chunks
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Auto MPG averages by cylinder count')
+    parser.add_argument('--chunk-rows', type=int, default=None,
+                        help='stream the file in chunks of N rows instead of loading it whole')
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
     repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
     path = os.path.join(repo_root, 'data', 'raw', 'auto-mpg.tab')
-    # Read file, skip the second row which contains types
-    df = pd.read_csv(path, sep='\t', header=0, skiprows=[1], na_values='?')
-    # Ensure numeric columns
-    df['horsepower'] = pd.to_numeric(df['horsepower'], errors='coerce')
-    df['mpg'] = pd.to_numeric(df['mpg'], errors='coerce')
-
-    grouped = df.groupby('cylinders')
-    avg_hp = grouped['horsepower'].mean()
-    avg_mpg = grouped['mpg'].mean()
+    hp = Stat('cylinders', 'horsepower', 'mean')
+    mpg = Stat('cylinders', 'mpg', 'mean')
+    if args.chunk_rows:
+        # out-of-core: one chunk of the file in memory at a time
+        res = stream_compute(lambda: iter_chunks(path, args.chunk_rows), [hp, mpg])
+    else:
+        # Typed columns ('?' horsepower -> NaN) come straight from the dataset cache
+        res = compute(load_dataset(path), [hp, mpg])
+    avg_hp = res[hp]
+    avg_mpg = res[mpg]
 
     print('Average horsepower by cylinders:\n', avg_hp)
     print('\nAverage mpg by cylinders:\n', avg_mpg)
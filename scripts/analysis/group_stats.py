@@ -0,0 +1,353 @@
+"""
+Group-By Statistics Engine
+Computes a batch of (group key, column, statistic) requests together instead of
+one boolean-mask scan per question. Each group key is factorized once; counts,
+sums, means, standard deviations and Pearson co-moments for every group come
+from np.bincount reductions over those codes, and quantiles from a single
+(group, value) sort per column. Above `sketch_rows` rows quantiles switch to a
+per-group histogram sketch built with one bincount, with error bounded by the
+group's range / `sketch_bins`.
+
+Statistics follow pandas' defaults: NaNs are skipped, std uses ddof=1, and
+quantiles interpolate linearly.
+
+stream_compute() answers the same requests over an iterator of DataFrame chunks
+with memory independent of file size: each chunk is reduced to per-group
+partial aggregates (count, mean, centred sums of squares, co-moments, min/max)
+which are merged with Chan et al.'s pairwise update. Quantiles need a second
+pass over the chunks, filling a fixed-size histogram between the first pass's
+per-group min and max.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+# stat is 'count', 'mean', 'std', 'min', 'max', 'quantile' (arg=q) or 'corr' (arg=other column);
+# group=None computes over the whole frame
+Stat = namedtuple('Stat', ['group', 'column', 'stat', 'arg'], defaults=(None,))
+
+SKETCH_ROWS = 5_000_000
+SKETCH_BINS = 4096
+
+
+class _Grouping:
+    """Factorized group key with per-column reductions cached across requests."""
+
+    def __init__(self, df, key):
+        if key is None:
+            self.codes = np.zeros(len(df), dtype=np.intp)
+            self.labels = None
+        else:
+            self.codes, self.labels = pd.factorize(df[key], sort=True)
+        self.n_groups = 1 if key is None else len(self.labels)
+        self.key = key
+        self.df = df
+        self._cache = {}
+
+    def _values(self, column):
+        return np.asarray(self.df[column], dtype=np.float64)
+
+    def moments(self, column):
+        """count, mean and centred sum of squares per group (NaN-skipping)."""
+        if ('m', column) not in self._cache:
+            x = self._values(column)
+            ok = (self.codes >= 0) & ~np.isnan(x)
+            g, x = self.codes[ok], x[ok]
+            count = np.bincount(g, minlength=self.n_groups).astype(np.float64)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                mean = np.bincount(g, weights=x, minlength=self.n_groups) / count
+                # second pass around the group mean keeps the variance stable for large offsets
+                m2 = np.bincount(g, weights=(x - mean[g]) ** 2, minlength=self.n_groups)
+            self._cache[('m', column)] = (count, mean, m2)
+        return self._cache[('m', column)]
+
+    def extrema(self, column):
+        if ('x', column) not in self._cache:
+            x = self._values(column)
+            ok = (self.codes >= 0) & ~np.isnan(x)
+            lo = np.full(self.n_groups, np.inf)
+            hi = np.full(self.n_groups, -np.inf)
+            np.minimum.at(lo, self.codes[ok], x[ok])
+            np.maximum.at(hi, self.codes[ok], x[ok])
+            self._cache[('x', column)] = (lo, hi)
+        return self._cache[('x', column)]
+
+    def sorted_values(self, column):
+        """Values sorted by (group, value) with NaNs dropped, plus each group's start offset."""
+        if ('s', column) not in self._cache:
+            x = self._values(column)
+            ok = (self.codes >= 0) & ~np.isnan(x)
+            g, x = self.codes[ok], x[ok]
+            order = np.lexsort((x, g))
+            counts = np.bincount(g, minlength=self.n_groups)
+            starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+            self._cache[('s', column)] = (x[order], starts, counts)
+        return self._cache[('s', column)]
+
+    def quantile(self, column, q, sketch_rows=SKETCH_ROWS, sketch_bins=SKETCH_BINS):
+        if len(self.df) > sketch_rows:
+            return self._sketch_quantile(column, q, sketch_bins)
+        values, starts, counts = self.sorted_values(column)
+        pos = starts + q * np.maximum(counts - 1, 0)
+        lo = np.floor(pos).astype(np.intp)
+        hi = np.minimum(lo + 1, starts + np.maximum(counts - 1, 0))
+        frac = pos - lo
+        safe = counts > 0
+        out = np.full(self.n_groups, np.nan)
+        out[safe] = values[lo[safe]] + (values[hi[safe]] - values[lo[safe]]) * frac[safe]
+        return out
+
+    def _sketch_quantile(self, column, q, bins):
+        lo, hi = self.extrema(column)
+        if ('h', column) not in self._cache:
+            x = self._values(column)
+            ok = (self.codes >= 0) & ~np.isnan(x)
+            g, x = self.codes[ok], x[ok]
+            width = np.where(hi > lo, (hi - lo) / bins, 1.0)
+            b = np.minimum(((x - lo[g]) / width[g]).astype(np.intp), bins - 1)
+            hist = np.bincount(g * bins + b, minlength=self.n_groups * bins).reshape(self.n_groups, bins)
+            self._cache[('h', column)] = hist
+        return _hist_quantile(self._cache[('h', column)], lo, hi, q)
+
+    def comoments(self, a, b):
+        """n, means and centred (co)sums of squares of a and b per group, over rows where both are present."""
+        x, y = self._values(a), self._values(b)
+        ok = (self.codes >= 0) & ~np.isnan(x) & ~np.isnan(y)
+        g, x, y = self.codes[ok], x[ok], y[ok]
+        n = np.bincount(g, minlength=self.n_groups).astype(np.float64)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mx = np.bincount(g, weights=x, minlength=self.n_groups) / n
+            my = np.bincount(g, weights=y, minlength=self.n_groups) / n
+        dx, dy = x - mx[g], y - my[g]
+        sxx = np.bincount(g, weights=dx * dx, minlength=self.n_groups)
+        syy = np.bincount(g, weights=dy * dy, minlength=self.n_groups)
+        sxy = np.bincount(g, weights=dx * dy, minlength=self.n_groups)
+        return n, mx, my, sxx, syy, sxy
+
+    def corr(self, a, b):
+        _, _, _, sxx, syy, sxy = self.comoments(a, b)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return sxy / np.sqrt(sxx * syy)
+
+
+def _reduce(grouping, req, sketch_rows, sketch_bins):
+    stat = req.stat
+    if stat in ('count', 'mean', 'std'):
+        count, mean, m2 = grouping.moments(req.column)
+        if stat == 'count':
+            return count
+        if stat == 'mean':
+            return mean
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(count > 1, np.sqrt(m2 / (count - 1)), np.nan)
+    if stat in ('min', 'max'):
+        lo, hi = grouping.extrema(req.column)
+        return lo if stat == 'min' else hi
+    if stat == 'quantile':
+        return grouping.quantile(req.column, req.arg, sketch_rows, sketch_bins)
+    if stat == 'corr':
+        return grouping.corr(req.column, req.arg)
+    raise ValueError(f'unknown statistic: {stat}')
+
+
+def compute(df, requests, sketch_rows=SKETCH_ROWS, sketch_bins=SKETCH_BINS):
+    """
+    Answer every Stat in `requests`. Returns {request: value}, where value is a
+    scalar for group=None and a Series indexed by group label otherwise.
+    """
+    groupings = {}
+    out = {}
+    for req in requests:
+        if req.group not in groupings:
+            groupings[req.group] = _Grouping(df, req.group)
+        grouping = groupings[req.group]
+        values = _reduce(grouping, req, sketch_rows, sketch_bins)
+        if req.group is None:
+            out[req] = float(values[0])
+        else:
+            out[req] = pd.Series(values, index=pd.Index(grouping.labels, name=req.group), name=req.column)
+    return out
+
+
+def _merge(na, ma, m2a, nb, mb, m2b):
+    """Pairwise (Chan et al.) merge of count / mean / centred sum of squares."""
+    n = na + nb
+    with np.errstate(invalid='ignore', divide='ignore'):
+        delta = mb - ma
+        mean = np.where(n > 0, ma + delta * nb / n, 0.0)
+        m2 = m2a + m2b + np.where(n > 0, delta ** 2 * na * nb / n, 0.0)
+    return n, mean, m2
+
+
+class _GroupState:
+    """Per-label partial aggregates of one group key, grown as new labels appear."""
+
+    def __init__(self):
+        self.slots = {}
+        self.labels = []
+        self.data = {}
+
+    def align(self, labels):
+        """Slot index in the merged state of each chunk-level group label."""
+        idx = []
+        for label in labels:
+            if label not in self.slots:
+                self.slots[label] = len(self.labels)
+                self.labels.append(label)
+            idx.append(self.slots[label])
+        n = len(self.labels)
+        for key, arrays in self.data.items():
+            self.data[key] = [np.concatenate([a, np.full(n - len(a), fill)])
+                              for a, fill in zip(arrays, _FILL[key[0]])]
+        return np.array(idx, dtype=np.intp)
+
+    def get(self, key):
+        if key not in self.data:
+            self.data[key] = [np.full(len(self.labels), fill) for fill in _FILL[key[0]]]
+        return self.data[key]
+
+
+# initial values of each partial aggregate: moments (n, mean, m2), extrema (min, max),
+# co-moments (n, mx, my, sxx, syy, sxy) and histograms
+_FILL = {'m': (0.0, 0.0, 0.0), 'x': (np.inf, -np.inf), 'c': (0.0,) * 6}
+
+
+def _labels(grouping):
+    return [None] if grouping.labels is None else list(grouping.labels)
+
+
+def _agg_key(req):
+    """Partial aggregate a request is answered from; requests sharing one are merged once per chunk."""
+    if req.stat in ('count', 'mean', 'std'):
+        return ('m', req.column)
+    if req.stat in ('min', 'max', 'quantile'):
+        return ('x', req.column)
+    if req.stat == 'corr':
+        return ('c', req.column, req.arg)
+    raise ValueError(f'unknown statistic: {req.stat}')
+
+
+def _update(state, grouping, key):
+    idx = state.align(_labels(grouping))
+    acc = state.get(key)
+    if key[0] == 'm':
+        n, mean, m2 = grouping.moments(key[1])
+        merged = _merge(acc[0][idx], acc[1][idx], acc[2][idx], n, np.nan_to_num(mean), m2)
+        acc[0][idx], acc[1][idx], acc[2][idx] = merged
+    elif key[0] == 'x':
+        lo, hi = grouping.extrema(key[1])
+        acc[0][idx] = np.minimum(acc[0][idx], lo)
+        acc[1][idx] = np.maximum(acc[1][idx], hi)
+    else:
+        n, mx, my, sxx, syy, sxy = grouping.comoments(key[1], key[2])
+        mx, my = np.nan_to_num(mx), np.nan_to_num(my)
+        an, amx, amy = acc[0][idx], acc[1][idx], acc[2][idx]
+        tot, new_mx, sxx_m = _merge(an, amx, acc[3][idx], n, mx, sxx)
+        _, new_my, syy_m = _merge(an, amy, acc[4][idx], n, my, syy)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            cross = np.where(tot > 0, (mx - amx) * (my - amy) * an * n / tot, 0.0)
+        acc[5][idx] = acc[5][idx] + sxy + cross
+        acc[0][idx], acc[1][idx], acc[2][idx], acc[3][idx], acc[4][idx] = tot, new_mx, new_my, sxx_m, syy_m
+
+
+def _histogram_pass(chunks, states, requests, bins):
+    """Second pass: per-group histograms between the merged min/max of each quantile column."""
+    wanted = sorted({(req.group, req.column) for req in requests if req.stat == 'quantile'}, key=repr)
+    hists = {}
+    for chunk in chunks:
+        groupings = {}
+        for group, column in wanted:
+            if group not in groupings:
+                groupings[group] = _Grouping(chunk, group)
+            grouping = groupings[group]
+            state = states[group]
+            idx = state.align(_labels(grouping))
+            n_slots = len(state.labels)
+            hist = hists.get((group, column), np.zeros((0, bins), dtype=np.int64))
+            if len(hist) < n_slots:
+                hist = np.vstack([hist, np.zeros((n_slots - len(hist), bins), dtype=np.int64)])
+            lo_all, hi_all = state.get(('x', column))
+            x = grouping._values(column)
+            ok = (grouping.codes >= 0) & ~np.isnan(x)
+            slot = idx[grouping.codes[ok]]
+            lo, hi = lo_all[slot], hi_all[slot]
+            width = np.where(hi > lo, (hi - lo) / bins, 1.0)
+            b = np.minimum(((x[ok] - lo) / width).astype(np.intp), bins - 1)
+            hist += np.bincount(slot * bins + b, minlength=n_slots * bins).reshape(n_slots, bins)
+            hists[(group, column)] = hist
+    return hists
+
+
+def _hist_quantile(hist, lo, hi, q):
+    """
+    Quantile from per-group histograms over [lo, hi]. The order statistics either
+    side of the target rank are placed inside their bins, then interpolated
+    linearly as in the exact path, so the error stays within one bin width.
+    """
+    bins = hist.shape[1]
+    cum = np.cumsum(hist, axis=1)
+    n = cum[:, -1]
+    rows = np.arange(len(hist))
+    width = np.where(hi > lo, (hi - lo) / bins, 1.0)
+
+    def value_at(rank):
+        idx = np.minimum(np.array([np.searchsorted(cum[i], rank[i], side='right') for i in rows],
+                                  dtype=np.intp), bins - 1)
+        before = np.where(idx > 0, cum[rows, idx - 1], 0)
+        in_bin = np.maximum(cum[rows, idx] - before, 1)
+        return np.minimum(lo + (idx + (rank - before + 0.5) / in_bin) * width, hi)
+
+    pos = q * np.maximum(n - 1, 0)
+    below = np.floor(pos)
+    above = np.minimum(below + 1, np.maximum(n - 1, 0))
+    v_lo, v_hi = value_at(below), value_at(above)
+    return np.where(n > 0, v_lo + (v_hi - v_lo) * (pos - below), np.nan)
+
+
+def stream_compute(make_chunks, requests, sketch_bins=SKETCH_BINS):
+    """
+    Out-of-core compute(): `make_chunks()` must return a fresh iterator of
+    DataFrame chunks (it is called a second time only if a quantile is requested).
+    Group labels are ordered by sort order, matching compute().
+    """
+    aggregates = list(dict.fromkeys((req.group, _agg_key(req)) for req in requests))
+    states = {}
+    for chunk in make_chunks():
+        groupings = {}
+        for group, key in aggregates:
+            if group not in groupings:
+                groupings[group] = _Grouping(chunk, group)
+            _update(states.setdefault(group, _GroupState()), groupings[group], key)
+
+    hists = {}
+    if any(req.stat == 'quantile' for req in requests):
+        hists = _histogram_pass(make_chunks(), states, requests, sketch_bins)
+
+    out = {}
+    for req in requests:
+        state = states[req.group]
+        if req.stat in ('count', 'mean', 'std'):
+            n, mean, m2 = state.get(('m', req.column))
+            with np.errstate(invalid='ignore', divide='ignore'):
+                values = {'count': n, 'mean': np.where(n > 0, mean, np.nan),
+                          'std': np.where(n > 1, np.sqrt(m2 / (n - 1)), np.nan)}[req.stat]
+        elif req.stat in ('min', 'max'):
+            lo, hi = state.get(('x', req.column))
+            values = lo if req.stat == 'min' else hi
+        elif req.stat == 'quantile':
+            lo, hi = state.get(('x', req.column))
+            hist = hists[(req.group, req.column)]
+            values = _hist_quantile(hist, lo[:len(hist)], hi[:len(hist)], req.arg)
+        else:
+            _, _, _, sxx, syy, sxy = state.get(('c', req.column, req.arg))
+            with np.errstate(invalid='ignore', divide='ignore'):
+                values = sxy / np.sqrt(sxx * syy)
+        if req.group is None:
+            out[req] = float(values[0])
+        else:
+            order = sorted(range(len(state.labels)), key=lambda i: state.labels[i])
+            index = pd.Index([state.labels[i] for i in order], name=req.group)
+            out[req] = pd.Series(np.asarray(values)[order], index=index, name=req.column)
+    return out
@@ -1,19 +1,36 @@
+import argparse
 import os
-import pandas as pd
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
-import seaborn as sns
+import sys
 
-sns.set(style='whitegrid')
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'utils'))
+from dataset_cache import load_dataset
+from plot_pipeline import DENSITY_ROWS, FigureJob, render_all, report, scatter_by_hue
 
-def main():
+def sepal_scatter(data, density_rows=DENSITY_ROWS):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    sns.set(style='whitegrid')
+    fig, ax = plt.subplots(figsize=(8,6))
+    scatter_by_hue(ax, data, 'SepalLength', 'SepalWidth', 'Species', density_rows=density_rows)
+    ax.set_title('Iris Dataset: Sepal Length vs Sepal Width')
+    plt.tight_layout()
+    return fig
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Iris report figures')
+    parser.add_argument('--n-jobs', type=int, default=None, help='render processes (default: all cores)')
+    parser.add_argument('--density-rows', type=int, default=DENSITY_ROWS,
+                        help='draw scatter plots as a density raster above this many rows')
+    parser.add_argument('--force', action='store_true', help='redraw every figure even if unchanged')
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
     repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
     data_path = os.path.join(repo_root, 'data', 'raw', 'iris.tab')
     results_dir = os.path.join(repo_root, 'results')
-    os.makedirs(results_dir, exist_ok=True)
     
-    df = pd.read_csv(data_path, sep='\t')
+    df = load_dataset(data_path)
     print('Read iris data:', df.shape)
     
     # Basic stats
@@ -21,14 +38,9 @@ def main():
     print(df.describe())
     
     # Plot
-    fig, ax = plt.subplots(figsize=(8,6))
-    sns.scatterplot(data=df, x='SepalLength', y='SepalWidth', hue='Species', ax=ax)
-    ax.set_title('Iris Dataset: Sepal Length vs Sepal Width')
-    plt.tight_layout()
-    plot_path = os.path.join(results_dir, 'iris_sepal_scatter.png')
-    fig.savefig(plot_path)
-    plt.close(fig)
-    print('Saved plot to', plot_path)
+    jobs = [FigureJob(os.path.join(results_dir, 'iris_sepal_scatter.png'), sepal_scatter,
+                      df[['SepalLength', 'SepalWidth', 'Species']], {'density_rows': args.density_rows})]
+    report(render_all(jobs, os.path.join(results_dir, 'cache'), n_jobs=args.n_jobs, force=args.force))
 
 if __name__ == '__main__':
     main()
@@ -1,27 +1,47 @@
-import pandas as pd
-
-def main():
-    import os
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'utils'))
+from dataset_cache import load_dataset
+from group_stats import Stat, compute, stream_compute
+from tab_reader import iter_chunks
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Iris summary statistics by species')
+    parser.add_argument('--chunk-rows', type=int, default=None,
+                        help='stream the file in chunks of N rows instead of loading it whole')
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
     repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
     data_path = os.path.join(repo_root, 'data', 'raw', 'iris.tab')
-    
-    df = pd.read_csv(data_path, sep='\t')
+
+    # All five questions answered from one factorization of Species
+    mean_sl = Stat('Species', 'SepalLength', 'mean')
+    std_sw = Stat('Species', 'SepalWidth', 'std')
+    q3_pl = Stat('Species', 'PetalLength', 'quantile', 0.75)
+    corr_pw_pl = Stat(None, 'PetalWidth', 'corr', 'PetalLength')
+    corr_pw_sw = Stat(None, 'PetalWidth', 'corr', 'SepalWidth')
+    requests = [mean_sl, std_sw, q3_pl, corr_pw_pl, corr_pw_sw]
+    if args.chunk_rows:
+        res = stream_compute(lambda: iter_chunks(data_path, args.chunk_rows), requests)
+    else:
+        res = compute(load_dataset(data_path), requests)
 
     # Mean sepal length for setosa
-    setosa = df[df['Species'] == 'setosa']
-    mean_sepal_length_setosa = setosa['SepalLength'].mean()
+    mean_sepal_length_setosa = res[mean_sl]['setosa']
 
     # Std dev sepal width for virginica
-    virginica = df[df['Species'] == 'virginica']
-    std_sepal_width_virginica = virginica['SepalWidth'].std()
+    std_sepal_width_virginica = res[std_sw]['virginica']
 
     # 3rd quartile (75th percentile) of petal length for versicolor
-    versicolor = df[df['Species'] == 'versicolor']
-    q3_petal_length_versicolor = versicolor['PetalLength'].quantile(0.75)
+    q3_petal_length_versicolor = res[q3_pl]['versicolor']
 
     # Correlations (Pearson)
-    corr_petalwidth_petallength = df['PetalWidth'].corr(df['PetalLength'])
-    corr_petalwidth_sepalwidth = df['PetalWidth'].corr(df['SepalWidth'])
+    corr_petalwidth_petallength = res[corr_pw_pl]
+    corr_petalwidth_sepalwidth = res[corr_pw_sw]
 
     print('Mean sepal length (setosa):', round(mean_sepal_length_setosa, 3))
     print('Std dev sepal width (virginica):', round(std_sepal_width_virginica, 3))
@@ -0,0 +1,190 @@
+"""
+Cached Plot Pipeline
+Each figure is declared as a FigureJob: a module-level render function, the
+data slice it draws and its plotting parameters. The job key is a hash of
+the data, the parameters, the render function's source and the source of
+this module (the drawing helpers render functions call, such as
+scatter_by_hue, and their constants), and a manifest
+remembers the key each output file was written with. Only jobs whose key
+changed (or whose file is missing) are rendered, spread over a process pool,
+so matplotlib/seaborn are only imported by the processes that actually draw.
+
+scatter_by_hue switches large scatter plots to a binned density raster.
+"""
+
+import functools
+import hashlib
+import inspect
+import json
+import os
+import sys
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+FigureJob = namedtuple('FigureJob', ['path', 'render', 'data', 'params'])
+FigureJob.__new__.__defaults__ = ({},)
+
+MANIFEST_NAME = 'plot_manifest.json'
+
+
+def digest_data(data):
+    """Hash of a DataFrame/Series slice: index, columns, dtypes and values."""
+    h = hashlib.sha256()
+    if isinstance(data, pd.Series):
+        data = data.to_frame()
+    h.update(repr([(str(c), str(t)) for c, t in data.dtypes.items()]).encode())
+    h.update(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def _source(fn):
+    try:
+        return inspect.getsource(fn)
+    except (OSError, TypeError):
+        return f"{getattr(fn, '__module__', '')}.{getattr(fn, '__qualname__', fn.__name__)}"
+
+
+@functools.lru_cache(maxsize=None)
+def _pipeline_source():
+    return _source(sys.modules[__name__])
+
+
+def job_key(job):
+    h = hashlib.sha256()
+    h.update(digest_data(job.data).encode())
+    h.update(json.dumps(job.params, sort_keys=True, default=repr).encode())
+    h.update(_source(job.render).encode())
+    h.update(_pipeline_source().encode())
+    return h.hexdigest()
+
+
+def _load_manifest(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _render(job):
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    root, ext = os.path.splitext(job.path)
+    tmp_path = f'{root}.tmp{ext}'
+    fig = job.render(job.data, **job.params)
+    try:
+        fig.savefig(tmp_path)
+    finally:
+        plt.close(fig)
+    os.replace(tmp_path, job.path)
+    return job.path
+
+
+def render_all(jobs, manifest_dir, n_jobs=None, force=False):
+    """
+    Render the jobs whose key changed since the last run. Returns a list of
+    (path, status) in job order, status being 'rendered' or 'unchanged'.
+    """
+    manifest_path = os.path.join(manifest_dir, MANIFEST_NAME)
+    manifest = _load_manifest(manifest_path)
+    keys = [job_key(job) for job in jobs]
+    stale = [(job, key) for job, key in zip(jobs, keys)
+             if force or manifest.get(os.path.abspath(job.path)) != key or not os.path.exists(job.path)]
+
+    n_jobs = os.cpu_count() if n_jobs in (None, -1) else n_jobs
+    if stale:
+        for job, _ in stale:
+            os.makedirs(os.path.dirname(os.path.abspath(job.path)), exist_ok=True)
+        if n_jobs == 1 or len(stale) == 1:
+            for job, _ in stale:
+                _render(job)
+        else:
+            with ProcessPoolExecutor(max_workers=min(n_jobs, len(stale))) as pool:
+                # list() re-raises the first render error here
+                list(pool.map(_render, [job for job, _ in stale]))
+        for job, key in stale:
+            manifest[os.path.abspath(job.path)] = key
+        os.makedirs(manifest_dir, exist_ok=True)
+        with open(manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=1, sort_keys=True)
+
+    redrawn = {id(job) for job, _ in stale}
+    return [(job.path, 'rendered' if id(job) in redrawn else 'unchanged') for job in jobs]
+
+
+def report(results):
+    for path, status in results:
+        print(f'{status:>9}: {path}')
+    print(f'{sum(s == "rendered" for _, s in results)} of {len(results)} figures redrawn')
+
+
+# Above this many rows scatter plots are drawn as a per-hue density raster
+DENSITY_ROWS = 100_000
+DENSITY_BINS = 300
+
+
+def _bin_index(values, lo, hi, bins):
+    span = hi - lo if hi > lo else 1.0
+    return np.clip(((values - lo) / span * bins).astype(np.intp), 0, bins - 1)
+
+
+def hue_density(x, y, codes, n_levels, bins=DENSITY_BINS):
+    """
+    Count points per (hue, y bin, x bin) in one bincount. Rows with a missing
+    x, y or hue are dropped. Returns (counts, extent) with counts shaped
+    (n_levels, bins, bins) and extent (x0, x1, y0, y1).
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    keep = ~(np.isnan(x) | np.isnan(y)) & (codes >= 0)
+    x, y, codes = x[keep], y[keep], np.asarray(codes)[keep]
+    if not len(x):
+        return np.zeros((n_levels, bins, bins), dtype=np.int64), (0.0, 1.0, 0.0, 1.0)
+    extent = (x.min(), x.max(), y.min(), y.max())
+    flat = (codes.astype(np.intp) * bins + _bin_index(y, extent[2], extent[3], bins)) * bins \
+        + _bin_index(x, extent[0], extent[1], bins)
+    counts = np.bincount(flat, minlength=n_levels * bins * bins).reshape(n_levels, bins, bins)
+    return counts, extent
+
+
+def density_image(counts, colors):
+    """RGBA raster: colour is the count-weighted mix of hue colours, opacity grows with log density."""
+    total = counts.sum(axis=0)
+    rgb = np.einsum('kij,kc->ijc', counts, np.asarray(colors, dtype=np.float64)[:, :3])
+    rgb /= np.maximum(total, 1)[..., None]
+    alpha = np.log1p(total) / np.log1p(max(total.max(), 1))
+    alpha = np.where(total > 0, 0.25 + 0.75 * alpha, 0.0)
+    return np.dstack([rgb, alpha])
+
+
+def scatter_by_hue(ax, data, x, y, hue, palette=None, density_rows=DENSITY_ROWS, bins=DENSITY_BINS):
+    """
+    sns.scatterplot for up to `density_rows` rows; above that the points are
+    binned per hue level with NumPy and drawn as a single image, so drawing
+    cost depends on the bin count rather than the row count.
+    """
+    import seaborn as sns
+
+    if len(data) <= density_rows:
+        sns.scatterplot(data=data, x=x, y=y, hue=hue, palette=palette, ax=ax)
+        return
+    from matplotlib.lines import Line2D
+
+    hue_values = data[hue].astype('category')
+    levels = list(hue_values.cat.categories)
+    codes = hue_values.cat.codes.to_numpy()
+    colors = sns.color_palette(palette, n_colors=len(levels))
+    counts, extent = hue_density(data[x].to_numpy(), data[y].to_numpy(), codes, len(levels), bins)
+    ax.imshow(density_image(counts, colors), origin='lower', extent=extent, aspect='auto',
+              interpolation='nearest')
+    ax.set_xlabel(x)
+    ax.set_ylabel(y)
+    present = counts.sum(axis=(1, 2)) > 0
+    handles = [Line2D([], [], marker='o', linestyle='', color=c, label=str(level))
+               for level, c, shown in zip(levels, colors, present) if shown]
+    ax.legend(handles=handles, title=hue)
@@ -1,35 +1,19 @@
 import os
-import pandas as pd
-import numpy as np
 
-repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
-
-# Load our Python results
-python_results = pd.read_csv(os.path.join(repo_root, 'results', 'weka_lab_results.csv'))
-
-# Load Week 7 reference results
-week7_results = pd.read_csv(os.path.join(repo_root, 'data', 'Week7_Activity_diabetes_dataset.csv'))
+import comparison
 
-# Convert our results to percentage and reshape for comparison
-python_df = python_results.copy()
-python_df['accuracy_pct'] = python_df['accuracy_mean'] * 100  # Convert to percentage
-
-# Reshape Python results to match Week 7 format
-python_pivot = python_df.pivot(index='variant', columns='classifier', values='accuracy_pct')
-python_pivot['Average'] = python_pivot.mean(axis=1)
-python_pivot = python_pivot.reset_index()
-python_pivot['variant'] = python_pivot['variant'].str.capitalize()
-python_pivot = python_pivot.rename(columns={'variant': 'Dataset'})
+repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
 
-# Reorder columns to match Week 7
-column_order = ['Dataset', 'NaiveBayes', 'J48', 'RandomForest', 'Logistic', 'SMO', 'Average']
-python_pivot = python_pivot[column_order]
+# Week 7 reference and our Python results, aligned once on (dataset, classifier)
+df = comparison.load_comparison()
+week7_results = comparison.wide(df, 'weka')
+python_pivot = comparison.wide(df, 'python')
 
 print("="*80)
 print("WEKA LAB ASSIGNMENT RESULTS COMPARISON")
 print("="*80)
 print("\n📊 WEEK 7 REFERENCE RESULTS (from Weka):")
-print(week7_results.to_string(index=False))
+print(week7_results.to_string(index=False, float_format='%.4f'))
 
 print("\n\n📊 OUR PYTHON RESULTS (10-fold Cross-Validation):")
 print(python_pivot.to_string(index=False, float_format='%.4f'))
@@ -38,62 +22,52 @@ print(python_pivot.to_string(index=False, float_format='%.4f'))
 print("\n\n📈 ACCURACY DIFFERENCES (Python - Weka):")
 print("="*80)
 
-comparison = []
-for idx, row in week7_results.iterrows():
-    dataset = row['Dataset']
-    python_row = python_pivot[python_pivot['Dataset'] == dataset].iloc[0]
-    
+# ✓ < 2 points, ⚠ < 5, ✗ otherwise
+marks = comparison.status(df['abs_diff'], [0, 2, 5, float('inf')], ['✓', '⚠', '✗']).astype(str)
+lines = ("  " + df['classifier'].astype(str).str.ljust(15)
+         + df['weka'].map(" | Weka: {:6.2f}%".format)
+         + df['python'].map(" | Python: {:6.2f}%".format)
+         + df['diff'].map(" | Diff: {:+6.2f}% ".format) + marks)
+for dataset, block in lines.groupby(df['dataset'], observed=True):
     print(f"\n{dataset} Dataset:")
     print("-" * 60)
-    
-    for classifier in ['NaiveBayes', 'J48', 'RandomForest', 'Logistic', 'SMO']:
-        weka_acc = row[classifier]
-        python_acc = python_row[classifier]
-        diff = python_acc - weka_acc
-        
-        # Color coding for terminal
-        status = "✓" if abs(diff) < 2 else ("⚠" if abs(diff) < 5 else "✗")
-        
-        print(f"  {classifier:15} | Weka: {weka_acc:6.2f}% | Python: {python_acc:6.2f}% | Diff: {diff:+6.2f}% {status}")
-        
-        comparison.append({
-            'Dataset': dataset,
-            'Classifier': classifier,
-            'Weka_Accuracy': weka_acc,
-            'Python_Accuracy': python_acc,
-            'Difference': diff,
-            'Abs_Difference': abs(diff)
-        })
+    print("\n".join(block))
+
+comparison_df = df.rename(columns={'dataset': 'Dataset', 'classifier': 'Classifier', 'weka': 'Weka_Accuracy',
+                                   'python': 'Python_Accuracy', 'diff': 'Difference', 'abs_diff': 'Abs_Difference'})
+comparison_df = comparison_df[['Dataset', 'Classifier', 'Weka_Accuracy', 'Python_Accuracy', 'Difference', 'Abs_Difference']]
 
 # Summary statistics
-comparison_df = pd.DataFrame(comparison)
 print("\n\n📊 SUMMARY STATISTICS:")
 print("="*80)
-print(f"Mean Absolute Difference: {comparison_df['Abs_Difference'].mean():.2f} percentage points")
-print(f"Max Absolute Difference: {comparison_df['Abs_Difference'].max():.2f} percentage points")
-print(f"Min Absolute Difference: {comparison_df['Abs_Difference'].min():.2f} percentage points")
-print(f"Std Dev of Differences: {comparison_df['Abs_Difference'].std():.2f} percentage points")
+print(f"Mean Absolute Difference: {df['abs_diff'].mean():.2f} percentage points")
+print(f"Max Absolute Difference: {df['abs_diff'].max():.2f} percentage points")
+print(f"Min Absolute Difference: {df['abs_diff'].min():.2f} percentage points")
+print(f"Std Dev of Differences: {df['abs_diff'].std():.2f} percentage points")
 
 # Find largest differences
 print("\n\n🔍 LARGEST DIFFERENCES (Top 5):")
 print("-" * 60)
-top_diffs = comparison_df.nlargest(5, 'Abs_Difference')
-for idx, row in top_diffs.iterrows():
-    print(f"  {row['Dataset']:12} | {row['Classifier']:15} | Diff: {row['Difference']:+6.2f}%")
+top_diffs = comparison.top(df, 5)
+print("\n".join("  " + top_diffs['dataset'].astype(str).str.ljust(12) + " | "
+                + top_diffs['classifier'].astype(str).str.ljust(15)
+                + top_diffs['diff'].map(" | Diff: {:+6.2f}%".format)))
 
 # Analysis by classifier
 print("\n\n📊 AVERAGE DIFFERENCE BY CLASSIFIER:")
 print("-" * 60)
-by_classifier = comparison_df.groupby('Classifier')['Abs_Difference'].agg(['mean', 'max'])
-for classifier, row in by_classifier.iterrows():
-    print(f"  {classifier:15} | Avg: {row['mean']:5.2f}% | Max: {row['max']:5.2f}%")
+by_classifier = comparison.by_group(df, 'classifier', ('mean', 'max'))
+print("\n".join("  " + by_classifier.index.astype(str).str.ljust(15)
+                + by_classifier['mean'].map(" | Avg: {:5.2f}%".format)
+                + by_classifier['max'].map(" | Max: {:5.2f}%".format)))
 
 # Analysis by dataset variant
 print("\n\n📊 AVERAGE DIFFERENCE BY DATASET VARIANT:")
 print("-" * 60)
-by_dataset = comparison_df.groupby('Dataset')['Abs_Difference'].agg(['mean', 'max'])
-for dataset, row in by_dataset.iterrows():
-    print(f"  {dataset:12} | Avg: {row['mean']:5.2f}% | Max: {row['max']:5.2f}%")
+by_dataset = comparison.by_group(df, 'dataset', ('mean', 'max'))
+print("\n".join("  " + by_dataset.index.astype(str).str.ljust(12)
+                + by_dataset['mean'].map(" | Avg: {:5.2f}%".format)
+                + by_dataset['max'].map(" | Max: {:5.2f}%".format)))
 
 # Save detailed comparison
 output_path = os.path.join(repo_root, 'results', 'detailed_comparison.csv')
@@ -103,7 +77,7 @@ print(f"\n\n💾 Detailed comparison saved to: {output_path}")
 # Final verdict
 print("\n\n🎯 CONCLUSION:")
 print("="*80)
-avg_diff = comparison_df['Abs_Difference'].mean()
+avg_diff = df['abs_diff'].mean()
 if avg_diff < 2:
     print("✅ EXCELLENT: Results are very close to Weka (avg diff < 2%)")
 elif avg_diff < 3:
@@ -0,0 +1,184 @@
+"""
+Weka vs Python Comparison
+Loads the Weka reference table and the lab results once and aligns them into
+one long frame with a join on (dataset, classifier):
+
+    dataset, classifier, weka, python, python_std, diff, abs_diff, status
+
+All accuracies are percentages. The comparison scripts build their diff
+tables, status buckets, top-N lists and per-group summaries from this frame
+with column operations instead of re-reading and re-pivoting the inputs.
+
+For significance, the lab's per-fold log is loaded as a (variant, classifier,
+repeat, fold) tensor and every classifier pair is tested at once with the
+Nadeau-Bengio corrected resampled t-test and a plain paired t-test.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+REFERENCE_PATH = os.path.join(repo_root, 'data', 'processed', 'Week7_Activity_diabetes_dataset.csv')
+RESULTS_PATH = os.path.join(repo_root, 'results', 'weka_lab_results.csv')
+FOLDS_PATH = os.path.join(repo_root, 'results', 'weka_lab_folds.csv')
+
+# Status buckets on |Python - Weka| in percentage points, lower bound inclusive
+STATUS_EDGES = [0.0, 1.0, 2.0, 3.0, 5.0, np.inf]
+STATUS_LABELS = ['Excellent', 'Good', 'Acceptable', 'Notable', 'Significant']
+
+
+def load_reference(path=REFERENCE_PATH):
+    """Wide reference table (Dataset row, one column per classifier) -> long (dataset, classifier, weka)."""
+    wide = pd.read_excel(path) if path.endswith(('.xlsx', '.xls')) else pd.read_csv(path)
+    wide = wide.drop(columns=['Average'], errors='ignore')
+    long = wide.melt(id_vars='Dataset', var_name='classifier', value_name='weka')
+    long = long.rename(columns={'Dataset': 'dataset'})
+    long['weka'] = pd.to_numeric(long['weka'].astype(str).str.rstrip('%'), errors='coerce')
+    return long
+
+
+def load_results(path=RESULTS_PATH):
+    """weka_lab_results.csv -> long (dataset, classifier, python, python_std) in percent."""
+    res = pd.read_csv(path)
+    return pd.DataFrame({'dataset': res['variant'].str.capitalize(),
+                         'classifier': res['classifier'],
+                         'python': res['accuracy_mean'] * 100,
+                         'python_std': res['accuracy_std'] * 100})
+
+
+def status(abs_diff, edges=STATUS_EDGES, labels=STATUS_LABELS):
+    return pd.cut(abs_diff, edges, labels=labels, right=False)
+
+
+def align(reference, results, how='inner'):
+    """
+    Join reference and results on (dataset, classifier). Datasets and classifiers
+    become ordered categoricals in reference order, so groupbys and pivots keep
+    the table layout.
+    """
+    df = reference.merge(results, on=['dataset', 'classifier'], how=how, validate='one_to_one')
+    for col in ('dataset', 'classifier'):
+        order = list(dict.fromkeys(list(reference[col]) + list(results[col])))
+        df[col] = pd.Categorical(df[col], categories=order, ordered=True)
+    df['diff'] = df['python'] - df['weka']
+    df['abs_diff'] = df['diff'].abs()
+    df['status'] = status(df['abs_diff'])
+    return df.sort_values(['dataset', 'classifier'], ignore_index=True)
+
+
+def load_comparison(reference_path=REFERENCE_PATH, results_path=RESULTS_PATH, how='inner'):
+    return align(load_reference(reference_path), load_results(results_path), how=how)
+
+
+def wide(aligned, value, average=True):
+    """One row per dataset, one column per classifier (plus their mean)."""
+    table = aligned.pivot(index='dataset', columns='classifier', values=value)
+    table.columns = list(table.columns)
+    if average:
+        table['Average'] = table.mean(axis=1)
+    return table.rename_axis('Dataset').reset_index().astype({'Dataset': str})
+
+
+def by_group(aligned, key, stats=('mean', 'min', 'max')):
+    return aligned.groupby(key, observed=True)['abs_diff'].agg(list(stats))
+
+
+def top(aligned, n=5):
+    return aligned.nlargest(n, 'abs_diff')
+
+
+def status_counts(aligned):
+    return aligned['status'].value_counts(sort=False)
+
+
+def mismatches(aligned, threshold=1.0):
+    return aligned[aligned['abs_diff'] > threshold]
+
+
+def load_fold_scores(path=FOLDS_PATH):
+    """
+    Per-fold log (variant, classifier, repeat, fold, accuracy) -> score tensor of
+    shape (variant, classifier, repeat, fold) plus the variant and classifier
+    labels in first-seen order. Missing cells are NaN.
+    """
+    log = pd.read_csv(path)
+    v_codes, variants = pd.factorize(log['variant'])
+    c_codes, classifiers = pd.factorize(log['classifier'])
+    repeat = log['repeat'].to_numpy() if 'repeat' in log else np.zeros(len(log), dtype=np.intp)
+    fold = log['fold'].to_numpy()
+    scores = np.full((len(variants), len(classifiers), repeat.max() + 1, fold.max() + 1), np.nan)
+    scores[v_codes, c_codes, repeat, fold] = log['accuracy'].to_numpy()
+    return scores, list(variants), list(classifiers)
+
+
+def pairwise_tests(scores, test_train_ratio):
+    """
+    Paired t-tests between every pair of classifiers of every variant at once.
+
+    `scores` is (variant, classifier, repeat, fold). The per-run differences of a
+    pair are never built: their mean is the difference of means and their
+    variance is var_a + var_b - 2 cov_ab, with all covariances coming from one
+    matrix product per variant. Returns the mean difference (a - b), the
+    Nadeau-Bengio corrected resampled t statistic, the plain paired t
+    statistic, each shaped (variant, classifier, classifier), and the degrees
+    of freedom.
+    """
+    n_var, n_clf = scores.shape[:2]
+    runs = scores.reshape(n_var, n_clf, -1)
+    n = runs.shape[2]
+    mean = runs.mean(axis=2)
+    centered = runs - mean[..., None]
+    cov = centered @ centered.transpose(0, 2, 1) / (n - 1)
+    var = np.diagonal(cov, axis1=1, axis2=2)
+    diff = mean[:, :, None] - mean[:, None, :]
+    var_diff = np.maximum(var[:, :, None] + var[:, None, :] - 2 * cov, 0.0)
+
+    def t_stat(scale):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t = diff / np.sqrt(scale * var_diff)
+        # identical score vectors: no difference at all
+        return np.where((var_diff == 0) & (diff == 0), 0.0, t)
+
+    # the test/train overlap between runs inflates the plain variance estimate;
+    # Nadeau & Bengio widen it by n_test/n_train (Weka Experimenter default)
+    return diff, t_stat(1 / n + test_train_ratio), t_stat(1 / n), n - 1
+
+
+def significance_table(scores, variants, classifiers, test_train_ratio, alpha=0.05):
+    """Long table of every classifier pair (a < b) per variant with both tests' p-values."""
+    from scipy import stats
+
+    diff, t_corr, t_paired, dof = pairwise_tests(scores, test_train_ratio)
+    v, a, b = np.nonzero(np.triu(np.ones(diff.shape, dtype=bool), k=1))
+    p_corr = 2 * stats.t.sf(np.abs(t_corr[v, a, b]), dof)
+    table = pd.DataFrame({
+        'variant': np.asarray(variants, dtype=object)[v],
+        'a': np.asarray(classifiers, dtype=object)[a],
+        'b': np.asarray(classifiers, dtype=object)[b],
+        'mean_diff': diff[v, a, b] * 100,
+        't_corrected': t_corr[v, a, b],
+        'p_corrected': p_corr,
+        't_paired': t_paired[v, a, b],
+        'p_paired': 2 * stats.t.sf(np.abs(t_paired[v, a, b]), dof),
+    })
+    table['result'] = np.select([(p_corr < alpha) & (table['mean_diff'] > 0),
+                                 (p_corr < alpha) & (table['mean_diff'] < 0)], ['a wins', 'b wins'], 'tie')
+    return table
+
+
+def ranking(table):
+    """Weka-style ranking per variant: significant wins minus losses under the corrected test."""
+    wins = pd.concat([table.loc[table['result'] == 'a wins', ['variant', 'a', 'b']]
+                      .rename(columns={'a': 'classifier', 'b': 'other'}),
+                      table.loc[table['result'] == 'b wins', ['variant', 'b', 'a']]
+                      .rename(columns={'b': 'classifier', 'a': 'other'})])
+    everyone = pd.concat([table[['variant', 'a']].rename(columns={'a': 'classifier'}),
+                          table[['variant', 'b']].rename(columns={'b': 'classifier'})]).drop_duplicates()
+    won = wins.groupby(['variant', 'classifier']).size().rename('wins')
+    lost = wins.groupby(['variant', 'other']).size().rename_axis(['variant', 'classifier']).rename('losses')
+    out = everyone.set_index(['variant', 'classifier']).join(won).join(lost).fillna(0).astype(int)
+    out['wins_minus_losses'] = out['wins'] - out['losses']
+    return out.reset_index().sort_values(['variant', 'wins_minus_losses'], ascending=[True, False],
+                                         ignore_index=True)
@@ -3,33 +3,13 @@ Complete Comparison: ALL Classifiers and Datasets
 Python Results vs Week 7 Weka Reference
 """
 
-import os
-import pandas as pd
-import numpy as np
-
-repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
-
-# Week 7 Reference Results (from Weka)
-weka_data = {
-    'Dataset': ['Original', 'Discretized', 'Normalized'],
-    'NaiveBayes': [76.3021, 75.3906, 76.3021],
-    'J48': [73.8281, 73.8281, 73.8281],
-    'RandomForest': [75.7813, 73.1771, 75.0000],
-    'Logistic': [77.2135, 75.2604, 77.2135],
-    'SMO': [77.3438, 73.6979, 77.3438],
-    'Average': [76.09376, 74.27082, 75.9375]
-}
-weka_df = pd.DataFrame(weka_data)
-
-# Load our Python results
-python_results = pd.read_csv(os.path.join(repo_root, 'results', 'weka_lab_results.csv'))
-python_results['accuracy_pct'] = python_results['accuracy_mean'] * 100
-python_pivot = python_results.pivot(index='variant', columns='classifier', values='accuracy_pct')
-python_pivot['Average'] = python_pivot.mean(axis=1)
-python_pivot = python_pivot.reset_index()
-python_pivot['variant'] = python_pivot['variant'].str.capitalize()
-python_pivot = python_pivot.rename(columns={'variant': 'Dataset'})
-python_pivot = python_pivot[['Dataset', 'NaiveBayes', 'J48', 'RandomForest', 'Logistic', 'SMO', 'Average']]
+import comparison
+
+# Week 7 Weka reference and our Python results, aligned once on (dataset, classifier)
+diff_df = comparison.load_comparison()
+weka_df = comparison.wide(diff_df, 'weka')
+python_pivot = comparison.wide(diff_df, 'python')
+n_total = len(diff_df)
 
 print('=' * 90)
 print('COMPLETE COMPARISON: ALL CLASSIFIERS AND DATASETS')
@@ -46,106 +26,81 @@ print(python_pivot.to_string(index=False, float_format='%.4f'))
 print('\n\n📈 DIFFERENCES (Python - Weka):')
 print('=' * 90)
 
-# Create difference table
-diff_data = []
-for idx, weka_row in weka_df.iterrows():
-    dataset = weka_row['Dataset']
-    python_row = python_pivot[python_pivot['Dataset'] == dataset].iloc[0]
-    
+# Status indicator per cell
+status_text = diff_df['status'].map({
+    'Excellent': '✅ Excellent (< 1%)',
+    'Good': '✓ Good (< 2%)',
+    'Acceptable': '⚠ Acceptable (< 3%)',
+    'Notable': '⚠ Notable (< 5%)',
+    'Significant': '⚠⚠ Significant (>= 5%)',
+}).astype(str)
+lines = (diff_df['classifier'].astype(str).str.ljust(15)
+         + diff_df['weka'].map(' {:>10.4f}'.format)
+         + diff_df['python'].map(' {:>10.4f}'.format)
+         + diff_df['diff'].map(' {:>+10.4f} '.format)
+         + status_text.str.rjust(20))
+for dataset, block in lines.groupby(diff_df['dataset'], observed=True):
     print(f'\n{dataset} Dataset:')
     print('-' * 90)
     print(f"{'Classifier':<15} {'Weka %':>10} {'Python %':>10} {'Diff':>10} {'Status':>20}")
     print('-' * 90)
-    
-    for classifier in ['NaiveBayes', 'J48', 'RandomForest', 'Logistic', 'SMO']:
-        weka_val = weka_row[classifier]
-        python_val = python_row[classifier]
-        diff = python_val - weka_val
-        
-        # Status indicator
-        if abs(diff) < 1.0:
-            status = '✅ Excellent (< 1%)'
-        elif abs(diff) < 2.0:
-            status = '✓ Good (< 2%)'
-        elif abs(diff) < 3.0:
-            status = '⚠ Acceptable (< 3%)'
-        elif abs(diff) < 5.0:
-            status = '⚠ Notable (< 5%)'
-        else:
-            status = '⚠⚠ Significant (>= 5%)'
-        
-        print(f"{classifier:<15} {weka_val:>10.4f} {python_val:>10.4f} {diff:>+10.4f} {status:>20}")
-        
-        diff_data.append({
-            'Dataset': dataset,
-            'Classifier': classifier,
-            'Weka': weka_val,
-            'Python': python_val,
-            'Difference': diff,
-            'Abs_Diff': abs(diff)
-        })
+    print('\n'.join(block))
 
 # Statistical summary
-diff_df = pd.DataFrame(diff_data)
-
 print('\n\n' + '=' * 90)
 print('📊 STATISTICAL SUMMARY')
 print('=' * 90)
 
 print('\nBy Classifier (Averaged across all datasets):')
 print('-' * 90)
-by_classifier = diff_df.groupby('Classifier').agg({
-    'Abs_Diff': ['mean', 'min', 'max']
-}).round(4)
+by_classifier = comparison.by_group(diff_df, 'classifier').round(4).rename_axis('Classifier')
 by_classifier.columns = ['Avg Abs Diff', 'Min Diff', 'Max Diff']
 print(by_classifier.to_string())
 
 print('\n\nBy Dataset (Averaged across all classifiers):')
 print('-' * 90)
-by_dataset = diff_df.groupby('Dataset').agg({
-    'Abs_Diff': ['mean', 'min', 'max']
-}).round(4)
+by_dataset = comparison.by_group(diff_df, 'dataset').round(4).rename_axis('Dataset')
 by_dataset.columns = ['Avg Abs Diff', 'Min Diff', 'Max Diff']
 print(by_dataset.to_string())
 
 print('\n\nOverall Statistics:')
 print('-' * 90)
-print(f"Mean Absolute Difference:    {diff_df['Abs_Diff'].mean():.4f}%")
-print(f"Median Absolute Difference:  {diff_df['Abs_Diff'].median():.4f}%")
-print(f"Std Dev of Differences:      {diff_df['Abs_Diff'].std():.4f}%")
-print(f"Min Difference:              {diff_df['Abs_Diff'].min():.4f}%")
-print(f"Max Difference:              {diff_df['Abs_Diff'].max():.4f}%")
+print(f"Mean Absolute Difference:    {diff_df['abs_diff'].mean():.4f}%")
+print(f"Median Absolute Difference:  {diff_df['abs_diff'].median():.4f}%")
+print(f"Std Dev of Differences:      {diff_df['abs_diff'].std():.4f}%")
+print(f"Min Difference:              {diff_df['abs_diff'].min():.4f}%")
+print(f"Max Difference:              {diff_df['abs_diff'].max():.4f}%")
 
 # Count by status
-excellent = (diff_df['Abs_Diff'] < 1.0).sum()
-good = ((diff_df['Abs_Diff'] >= 1.0) & (diff_df['Abs_Diff'] < 2.0)).sum()
-acceptable = ((diff_df['Abs_Diff'] >= 2.0) & (diff_df['Abs_Diff'] < 3.0)).sum()
-notable = ((diff_df['Abs_Diff'] >= 3.0) & (diff_df['Abs_Diff'] < 5.0)).sum()
-significant = (diff_df['Abs_Diff'] >= 5.0).sum()
+counts = comparison.status_counts(diff_df)
+excellent, good, acceptable, notable, significant = (counts[label] for label in comparison.STATUS_LABELS)
 
-print('\n\nResults Distribution (15 total experiments):')
+print(f'\n\nResults Distribution ({n_total} total experiments):')
 print('-' * 90)
-print(f"✅ Excellent (< 1%):       {excellent:2d} experiments ({excellent/15*100:.1f}%)")
-print(f"✓  Good (1-2%):            {good:2d} experiments ({good/15*100:.1f}%)")
-print(f"⚠  Acceptable (2-3%):      {acceptable:2d} experiments ({acceptable/15*100:.1f}%)")
-print(f"⚠  Notable (3-5%):         {notable:2d} experiments ({notable/15*100:.1f}%)")
-print(f"⚠⚠ Significant (>= 5%):    {significant:2d} experiments ({significant/15*100:.1f}%)")
+print(f"✅ Excellent (< 1%):       {excellent:2d} experiments ({excellent/n_total*100:.1f}%)")
+print(f"✓  Good (1-2%):            {good:2d} experiments ({good/n_total*100:.1f}%)")
+print(f"⚠  Acceptable (2-3%):      {acceptable:2d} experiments ({acceptable/n_total*100:.1f}%)")
+print(f"⚠  Notable (3-5%):         {notable:2d} experiments ({notable/n_total*100:.1f}%)")
+print(f"⚠⚠ Significant (>= 5%):    {significant:2d} experiments ({significant/n_total*100:.1f}%)")
 
 print('\n\n' + '=' * 90)
 print('🔍 TOP 5 LARGEST DIFFERENCES')
 print('=' * 90)
-top5 = diff_df.nlargest(5, 'Abs_Diff')
+top5 = comparison.top(diff_df, 5).reset_index(drop=True)
 print(f"\n{'Rank':<6} {'Dataset':<12} {'Classifier':<15} {'Weka %':>10} {'Python %':>10} {'Diff':>10}")
 print('-' * 90)
-for i, (idx, row) in enumerate(top5.iterrows(), 1):
-    print(f"{i:<6} {row['Dataset']:<12} {row['Classifier']:<15} "
-          f"{row['Weka']:>10.4f} {row['Python']:>10.4f} {row['Difference']:>+10.4f}")
+print('\n'.join((top5.index + 1).astype(str).str.ljust(6) + ' '
+                + top5['dataset'].astype(str).str.ljust(12) + ' '
+                + top5['classifier'].astype(str).str.ljust(15)
+                + top5['weka'].map(' {:>10.4f}'.format)
+                + top5['python'].map(' {:>10.4f}'.format)
+                + top5['diff'].map(' {:>+10.4f}'.format)))
 
 print('\n\n' + '=' * 90)
 print('🎯 FINAL ASSESSMENT')
 print('=' * 90)
 
-avg_diff = diff_df['Abs_Diff'].mean()
+avg_diff = diff_df['abs_diff'].mean()
 
 if avg_diff < 1.5:
     verdict = "✅ EXCELLENT"
@@ -165,9 +120,9 @@ print(f"Average Difference: {avg_diff:.2f}%")
 print(f"Assessment: {explanation}")
 
 print(f"\nBreakdown:")
-print(f"  • {excellent + good} out of 15 experiments within 2% (Excellent/Good)")
-print(f"  • {excellent + good + acceptable} out of 15 experiments within 3% (including Acceptable)")
-print(f"  • {15 - significant} out of 15 experiments within 5% (all except Significant)")
+print(f"  • {excellent + good} out of {n_total} experiments within 2% (Excellent/Good)")
+print(f"  • {excellent + good + acceptable} out of {n_total} experiments within 3% (including Acceptable)")
+print(f"  • {n_total - significant} out of {n_total} experiments within 5% (all except Significant)")
 
 print("\n\n💡 KEY INSIGHTS:")
 print("=" * 90)
@@ -3,21 +3,11 @@ RandomForest Accuracy Confirmation
 Validates RF results against Week 7 reference
 """
 
-import os
-import pandas as pd
+import comparison
 
-repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
-
-# Load data
-weka = pd.read_csv(os.path.join(repo_root, 'data', 'processed', 'Week7_Activity_diabetes_dataset.csv'))
-python_res = pd.read_csv(os.path.join(repo_root, 'results', 'weka_lab_results.csv'))
-
-# Convert to percentage
-python_res['accuracy_pct'] = python_res['accuracy_mean'] * 100
-python_res['accuracy_std_pct'] = python_res['accuracy_std'] * 100
-
-# Filter for RandomForest
-rf_python = python_res[python_res['classifier'] == 'RandomForest'].copy()
+# Weka reference and our results aligned on (dataset, classifier); RandomForest rows only
+df = comparison.load_comparison()
+rf = df[df['classifier'] == 'RandomForest']
 
 print('=' * 70)
 print('RANDOM FOREST ACCURACY CONFIRMATION')
@@ -25,48 +15,26 @@ print('=' * 70)
 
 print('\n📊 Weka Reference Results (from Week 7 Activity):')
 print('-' * 70)
-for dataset in ['Original', 'Discretized', 'Normalized']:
-    weka_val = weka.loc[weka['Dataset'] == dataset, 'RandomForest'].values[0]
-    print(f'  {dataset:12}  {weka_val:6.4f}%')
+print('\n'.join('  ' + rf['dataset'].astype(str).str.ljust(12) + rf['weka'].map('  {:6.4f}%'.format)))
 
 print('\n📊 Our Python Results (10-fold Cross-Validation):')
 print('-' * 70)
-for _, row in rf_python.iterrows():
-    print(f'  {row["variant"].capitalize():12}  {row["accuracy_pct"]:6.4f}% (±{row["accuracy_std_pct"]:.2f}%)')
+print('\n'.join('  ' + rf['dataset'].astype(str).str.ljust(12) + rf['python'].map('  {:6.4f}%'.format)
+                + rf['python_std'].map(' (±{:.2f}%)'.format)))
 
 print('\n📈 Differences (Python - Weka):')
 print('-' * 70)
-for _, row in rf_python.iterrows():
-    dataset = row['variant'].capitalize()
-    weka_val = weka.loc[weka['Dataset'] == dataset, 'RandomForest'].values[0]
-    python_val = row['accuracy_pct']
-    diff = python_val - weka_val
-    
-    if abs(diff) < 1:
-        status = '✓ EXCELLENT (< 1%)'
-    elif abs(diff) < 2:
-        status = '✓ GOOD (< 2%)'
-    elif abs(diff) < 3:
-        status = '✓ ACCEPTABLE (< 3%)'
-    else:
-        status = '⚠ NOTABLE (>= 3%)'
-    
-    print(f'  {dataset:12}  {diff:+6.2f}%  {status}')
+status_text = comparison.status(rf['abs_diff'], [0, 1, 2, 3, float('inf')], [
+    '✓ EXCELLENT (< 1%)', '✓ GOOD (< 2%)', '✓ ACCEPTABLE (< 3%)', '⚠ NOTABLE (>= 3%)']).astype(str)
+print('\n'.join('  ' + rf['dataset'].astype(str).str.ljust(12) + rf['diff'].map('  {:+6.2f}%  '.format)
+                + status_text))
 
 print('\n' + '=' * 70)
 print('✅ CONFIRMATION SUMMARY:')
 print('=' * 70)
 
-# Calculate average difference
-diffs = []
-for _, row in rf_python.iterrows():
-    dataset = row['variant'].capitalize()
-    weka_val = weka.loc[weka['Dataset'] == dataset, 'RandomForest'].values[0]
-    python_val = row['accuracy_pct']
-    diffs.append(abs(python_val - weka_val))
-
-avg_diff = sum(diffs) / len(diffs)
-max_diff = max(diffs)
+avg_diff = rf['abs_diff'].mean()
+max_diff = rf['abs_diff'].max()
 
 print(f'\nAverage Absolute Difference: {avg_diff:.2f}%')
 print(f'Maximum Absolute Difference: {max_diff:.2f}%')
@@ -0,0 +1,80 @@
+"""
+Discretizer Benchmark
+Fit time and CV accuracy of the supervised MDL discretizer
+(scripts/utils/mdl_discretizer.py) against the lab's quantile
+KBinsDiscretizer over growing dataset sizes.
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+
+repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+results_path = os.path.join(repo_root, 'results', 'discretizer_benchmark.csv')
+
+
+def _fit_time(step, X, y, repeats=3):
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        step.fit(X, y)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='MDL vs quantile discretization: fit time and CV accuracy')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[768, 10_000, 100_000, 1_000_000])
+    parser.add_argument('--cv-max-rows', type=int, default=100_000, help='skip the CV accuracy above this size')
+    parser.add_argument('--classifiers', nargs='+', default=['NaiveBayes', 'J48'])
+    parser.add_argument('--n-jobs', type=int, default=-1)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    import pandas as pd
+    from sklearn.model_selection import StratifiedKFold
+
+    from lab_engine import run_grid
+    from weka_lab import build_classifiers, build_variants, load_data
+
+    args = parse_args(argv)
+    X, y = load_data()
+    X, y = X.to_numpy(dtype=np.float64), y.to_numpy()
+    variants = {name: build_variants()[name] for name in ('discretized', 'discretized_mdl')}
+    classifiers = build_classifiers(args.classifiers)
+    rng = np.random.default_rng(0)
+
+    rows = []
+    for n in args.sizes:
+        if n == len(X):
+            Xn, yn = X, y
+        else:
+            # resampled rows, jittered so the larger sets have many more distinct values; near
+            # duplicates end up in train and test alike, so CV accuracy here is optimistic
+            idx = rng.integers(0, len(X), n)
+            Xn, yn = X[idx] * rng.normal(1.0, 0.02, (n, X.shape[1])), y[idx]
+        for name, step in variants.items():
+            row = {'rows': n, 'variant': name, 'fit_s': _fit_time(step, Xn, yn)}
+            if name == 'discretized_mdl':
+                row['bins_per_feature'] = np.mean([len(c) + 1 for c in step.fit(Xn, yn).cut_points_])
+            rows.append(row)
+        if n <= args.cv_max_rows:
+            cv = StratifiedKFold(n_splits=10, shuffle=True, random_state=42)
+            scores = {}
+            for res in run_grid(Xn, yn, variants, classifiers, cv, n_jobs=args.n_jobs):
+                scores.setdefault((res['variant'], res['classifier']), []).append(res['accuracy'])
+            for row in rows[-len(variants):]:
+                row.update({f'acc_{c}': np.mean(scores[(row['variant'], c)]) for c in classifiers})
+        print(pd.DataFrame(rows[-len(variants):]).to_string(index=False, float_format='{:.4f}'.format))
+
+    table = pd.DataFrame(rows)
+    os.makedirs(os.path.dirname(results_path), exist_ok=True)
+    table.to_csv(results_path, index=False)
+    print('\nSaved', results_path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,217 @@
+"""
+Flattened Tree Ensembles
+Copies the nodes of a fitted DecisionTreeClassifier or RandomForestClassifier
+(J48 / RandomForest in the lab) into a few contiguous NumPy arrays shared by
+all trees: split feature, threshold, children, missing-value direction and
+class probabilities. Leaves point to themselves, so one traversal step is a
+handful of gathers over all (tree, row) pairs of a block, and max_depth steps
+put every row of every tree on its leaf. There is no per-tree Python call, so
+small and medium batches skip most of sklearn's per-tree dispatch overhead.
+
+predict_proba reproduces sklearn bit for bit. sklearn compares float32 rows
+with float64 thresholds; thresholds are stored rounded down to float32, which
+gives the same decision for every float32 value. A forest's per-tree
+probabilities are summed in tree order and divided by the tree count, as
+RandomForestClassifier.predict_proba does with n_jobs=1.
+
+The arrays are saved as one .npz file, which loads without unpickling any
+estimator objects.
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+
+repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+models_dir = os.path.join(repo_root, 'results', 'models')
+
+# (tree, row) pairs per traversal block; keeps the work arrays cache-sized
+BLOCK_PAIRS = 16384
+# Pairs that reached a leaf are dropped from the block every this many levels
+COMPACT_EVERY = 3
+
+FIELDS = ['feature', 'threshold', 'children', 'missing_right', 'value', 'roots', 'depth', 'classes', 'average',
+          'n_features']
+
+
+def round_down_f32(threshold):
+    """Largest float32 <= each float64 threshold; x > t and x > round_down_f32(t) agree for float32 x."""
+    t32 = threshold.astype(np.float32)
+    over = t32.astype(np.float64) > threshold
+    t32[over] = np.nextafter(t32[over], np.float32(-np.inf))
+    return t32
+
+
+class FlatForest:
+    def __init__(self, feature, threshold, children, missing_right, value, roots, depth, classes, average,
+                 n_features):
+        self.feature = feature
+        self.threshold = threshold
+        # children[2 * node] is the left child, children[2 * node + 1] the right one
+        self.children = children
+        self.missing_right = missing_right
+        self.value = value
+        self.roots = roots
+        self.depth = int(depth)
+        self.classes_ = classes
+        self.average = bool(average)
+        self.n_features = int(n_features)
+        # traversal works on doubled node ids, so the child slot is 2 * node + go_right
+        self._feature2 = np.repeat(feature.astype(np.intp), 2)
+        self._threshold2 = np.repeat(threshold, 2)
+        self._missing2 = np.repeat(missing_right, 2)
+        self._children2 = 2 * children.astype(np.intp)
+        self._roots2 = 2 * roots.astype(np.intp)
+        self._leaf2 = np.repeat(children[0::2] == np.arange(len(feature)), 2)
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    def _apply_block(self, X):
+        m, n_features = X.shape
+        flat_x = X.ravel()
+        node = np.repeat(self._roots2, m)
+        base = np.tile(np.arange(m, dtype=np.intp) * n_features, self.n_trees)
+        out = node.copy()
+        pair = np.arange(len(node))
+        has_nan = np.isnan(flat_x).any()
+        for level in range(1, self.depth + 1):
+            x = flat_x[base + self._feature2[node]]
+            go_right = x > self._threshold2[node]
+            if has_nan:
+                go_right = np.where(np.isnan(x), self._missing2[node], go_right)
+            node = self._children2[node + go_right]
+            if level % COMPACT_EVERY == 0 and level < self.depth:
+                done = self._leaf2[node]
+                out[pair[done]] = node[done]
+                active = ~done
+                node, base, pair = node[active], base[active], pair[active]
+        out[pair] = node
+        return (out >> 1).reshape(self.n_trees, m)
+
+    def apply(self, X):
+        """Global leaf node id of every row in every tree, shaped (rows, trees)."""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(f'expected {self.n_features} features, got shape {X.shape}')
+        rows = max(1, BLOCK_PAIRS // self.n_trees)
+        if len(X) <= rows:
+            return self._apply_block(X).T
+        return np.concatenate([self._apply_block(X[i:i + rows]) for i in range(0, len(X), rows)], axis=1).T
+
+    def predict_proba(self, X):
+        leaves = self.value[self.apply(X)]
+        if not self.average:
+            return leaves[:, 0]
+        out = np.zeros((leaves.shape[0], leaves.shape[2]))
+        # same accumulation order as RandomForestClassifier.predict_proba
+        for t in range(self.n_trees):
+            out += leaves[:, t]
+        out /= self.n_trees
+        return out
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+def flatten(model):
+    """FlatForest of a fitted single-output DecisionTreeClassifier or forest classifier."""
+    if getattr(model, 'n_outputs_', 1) != 1:
+        raise ValueError('only single-output classifiers can be flattened')
+    trees = getattr(model, 'estimators_', None)
+    average = trees is not None
+    trees = trees if average else [model]
+    n_classes = len(model.classes_)
+    feature, threshold, children, missing_right, value, roots = [], [], [], [], [], []
+    offset = 0
+    for est in trees:
+        tree = est.tree_
+        ids = np.arange(tree.node_count) + offset
+        leaf = tree.children_left < 0
+        feature.append(np.where(leaf, 0, tree.feature))
+        threshold.append(tree.threshold)
+        left = np.where(leaf, ids, tree.children_left + offset)
+        right = np.where(leaf, ids, tree.children_right + offset)
+        children.append(np.column_stack([left, right]).ravel())
+        missing_right.append(tree.missing_go_to_left == 0)
+        value.append(tree.value[:, 0, :n_classes])
+        roots.append(offset)
+        offset += tree.node_count
+    return FlatForest(feature=np.concatenate(feature).astype(np.int32),
+                      threshold=round_down_f32(np.concatenate(threshold)),
+                      children=np.concatenate(children).astype(np.int32),
+                      missing_right=np.concatenate(missing_right),
+                      value=np.ascontiguousarray(np.concatenate(value), dtype=np.float64),
+                      roots=np.array(roots, dtype=np.int32),
+                      depth=max(est.tree_.max_depth for est in trees),
+                      classes=np.asarray(model.classes_),
+                      average=average,
+                      n_features=model.n_features_in_)
+
+
+def save_flat(path, flat):
+    np.savez(path, **{name: getattr(flat, 'classes_' if name == 'classes' else name) for name in FIELDS})
+
+
+def load_flat(path):
+    with np.load(path, allow_pickle=False) as data:
+        return FlatForest(**{name: data[name] for name in FIELDS})
+
+
+def _best_time(fn, repeats=5):
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Flatten the lab tree models and compare with sklearn')
+    parser.add_argument('--classifiers', nargs='+', default=['J48', 'RandomForest'])
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 16, 256, 4096, 65536])
+    parser.add_argument('--models-dir', default=models_dir)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    import joblib
+
+    from weka_lab import build_classifiers, load_data
+
+    args = parse_args(argv)
+    X, y = load_data()
+    X = X.to_numpy()
+    # scoring batches: resampled rows with some jitter so rows reach many different leaves
+    rng = np.random.default_rng(0)
+    os.makedirs(args.models_dir, exist_ok=True)
+
+    for name, est in build_classifiers(args.classifiers).items():
+        model = est.fit(X, y)
+        path = os.path.join(args.models_dir, f'diabetes_{name}_flat.npz')
+        save_flat(path, flatten(model))
+        flat = load_flat(path)
+        pickled = os.path.join(args.models_dir, f'diabetes_{name}.pkl')
+        joblib.dump(model, pickled)
+
+        print(f'{name}: {flat.n_trees} trees, {len(flat.feature)} nodes, depth {flat.depth}')
+        print(f'  load: joblib {_best_time(lambda: joblib.load(pickled)) * 1000:.2f} ms, '
+              f'npz {_best_time(lambda: load_flat(path)) * 1000:.2f} ms')
+        for n in args.batch_sizes:
+            batch = X[rng.integers(0, len(X), n)] * rng.normal(1.0, 0.05, (n, X.shape[1]))
+            if not np.array_equal(flat.predict_proba(batch), model.predict_proba(batch)):
+                raise SystemExit(f'{name}: flattened predictions differ from sklearn on {n} rows')
+            t_sklearn = _best_time(lambda: model.predict_proba(batch))
+            t_flat = _best_time(lambda: flat.predict_proba(batch))
+            print(f'  predict_proba {n:>6} rows: sklearn {t_sklearn * 1000:8.2f} ms, flat {t_flat * 1000:8.2f} ms '
+                  f'({t_sklearn / t_flat:5.1f}x), bit-identical')
+        os.remove(pickled)
+        print('  saved', path)
+
+
+if __name__ == '__main__':
+    main()
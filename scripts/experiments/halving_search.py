@@ -0,0 +1,171 @@
+"""
+Successive Halving Search
+Hyperparameter search over the lab's classifier registry where the budget is
+CV folds: every candidate is scored on a few folds, only the best 1/eta go on
+to be scored on eta times as many, and so on until the survivors have seen all
+folds. Hyperband runs several such brackets with different trade-offs between
+the number of candidates and their starting budget.
+
+The whole search runs on one LabEngine: its process pool and shared-memory
+data are set up once, all candidates of a rung share the variant's per-fold
+preprocessing, and each process keeps every fold's transformed matrices, so
+later rungs and brackets reuse them when a fold lands on the same process.
+Folds a candidate was already scored on are never refit.
+"""
+
+import argparse
+import math
+import os
+
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.model_selection import ParameterGrid, StratifiedKFold
+
+from lab_engine import LabEngine
+
+repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+results_path = os.path.join(repo_root, 'results', 'halving_search.csv')
+
+# Search space per classifier registry name (see weka_lab.CLASSIFIERS)
+SEARCH_SPACES = {
+    'NaiveBayes': {'var_smoothing': [1e-11, 1e-9, 1e-7, 1e-5, 1e-3]},
+    'J48': {'max_depth': [None, 3, 5, 8, 12], 'min_samples_leaf': [1, 2, 5, 10, 20],
+            'criterion': ['gini', 'entropy']},
+    'RandomForest': {'n_estimators': [50, 100, 200], 'max_depth': [None, 5, 10],
+                     'max_features': ['sqrt', 0.5], 'min_samples_leaf': [1, 3, 5]},
+    'Logistic': {'C': [0.001, 0.01, 0.1, 1, 10, 100]},
+    'SMO': {'C': [0.1, 1, 10, 100], 'gamma': ['scale', 0.01, 0.1, 1]},
+}
+
+
+def candidate_name(clf_name, params):
+    return clf_name + '[' + ','.join(f'{k}={v}' for k, v in sorted(params.items())) + ']'
+
+
+def build_candidates(classifiers, spaces=SEARCH_SPACES):
+    """name -> (classifier name, params, estimator) for every grid point of every classifier."""
+    candidates = {}
+    for clf_name, est in classifiers.items():
+        for params in ParameterGrid(spaces.get(clf_name, {})):
+            candidates[candidate_name(clf_name, params)] = (clf_name, params, clone(est).set_params(**params))
+    return candidates
+
+
+def rung_budgets(n_folds, min_folds, eta):
+    """Fold counts of successive rungs: min_folds, min_folds*eta, ... capped at n_folds."""
+    budgets = [min_folds]
+    while budgets[-1] < n_folds:
+        budgets.append(min(n_folds, budgets[-1] * eta))
+    return budgets
+
+
+class FoldScores:
+    """Per-candidate fold accuracies, shared by every rung and bracket of a search."""
+
+    def __init__(self, X, y, variant, step, cv, candidates, n_jobs=None):
+        self.cv, self.variant = cv, variant
+        self.engine = LabEngine(X, y, {variant: step}, {name: c[2] for name, c in candidates.items()}, [cv],
+                                n_jobs=n_jobs, memo_size=cv.get_n_splits())
+        self.scores = {}
+        self.fits = 0
+
+    def evaluate(self, names, n_folds):
+        """Make sure each named candidate has scores on folds 0..n_folds-1; fits only what is missing."""
+        all_folds = self.cv.get_n_splits()
+        skip = {(0, self.variant, name, k) for name in names for k in range(all_folds)
+                if k >= n_folds or k in self.scores.get(name, {})}
+        for res in self.engine.run(classifiers=names, skip=skip):
+            self.scores.setdefault(res['classifier'], {})[res['fold']] = res['accuracy']
+            self.fits += 1
+
+    def close(self):
+        self.engine.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def mean(self, name, n_folds):
+        return float(np.mean([self.scores[name][k] for k in range(n_folds)]))
+
+
+def successive_halving(store, candidates, names, min_folds, eta, bracket=0, log=None):
+    """Run one bracket; returns the surviving candidate names, best first."""
+    n_folds = store.cv.get_n_splits()
+    for rung, budget in enumerate(rung_budgets(n_folds, min_folds, eta)):
+        store.evaluate(names, budget)
+        ranked = sorted(names, key=lambda name: store.mean(name, budget), reverse=True)
+        keep = ranked if budget == n_folds else ranked[:max(1, math.ceil(len(ranked) / eta))]
+        if log is not None:
+            log.extend({'bracket': bracket, 'rung': rung, 'folds': budget, 'candidate': name,
+                        'classifier': candidates[name][0], 'accuracy': store.mean(name, budget),
+                        'promoted': name in keep and budget < n_folds} for name in ranked)
+        print(f'  bracket {bracket} rung {rung}: {len(names):4d} candidates x {budget:2d} folds, '
+              f'best {store.mean(ranked[0], budget):.4f} {ranked[0]}')
+        names = keep
+    return names
+
+
+def hyperband(store, candidates, eta, rng, log=None):
+    """
+    Hyperband over fold budgets: bracket s starts ~(s_max+1)/(s+1) * eta^s
+    randomly drawn candidates on n_folds / eta^s folds each.
+    """
+    n_folds = store.cv.get_n_splits()
+    s_max = int(math.floor(math.log(n_folds, eta) + 1e-9))
+    pool = list(candidates)
+    finalists = []
+    for s in range(s_max, -1, -1):
+        n = min(len(pool), math.ceil((s_max + 1) / (s + 1) * eta ** s))
+        min_folds = max(1, int(round(n_folds / eta ** s)))
+        names = list(rng.choice(pool, size=n, replace=False))
+        finalists += successive_halving(store, candidates, names, min_folds, eta, bracket=s_max - s, log=log)
+    return sorted(set(finalists), key=lambda name: store.mean(name, n_folds), reverse=True)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Successive halving / Hyperband over the lab classifiers')
+    parser.add_argument('--classifiers', nargs='+', default=list(SEARCH_SPACES))
+    parser.add_argument('--variant', default='original')
+    parser.add_argument('--mode', choices=['halving', 'hyperband'], default='halving')
+    parser.add_argument('--eta', type=int, default=3, help='keep the best 1/eta candidates per rung')
+    parser.add_argument('--min-folds', type=int, default=1, help='folds per candidate in the first rung')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--n-jobs', type=int, default=-1)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    from weka_lab import build_classifiers, build_variants, load_data
+
+    args = parse_args(argv)
+    X, y = load_data()
+    candidates = build_candidates(build_classifiers(args.classifiers))
+    cv = StratifiedKFold(n_splits=10, shuffle=True, random_state=args.seed)
+    n_folds = cv.get_n_splits()
+    store = FoldScores(X, y, args.variant, build_variants()[args.variant], cv, candidates, n_jobs=args.n_jobs)
+
+    print(f'{args.mode}: {len(candidates)} candidates on {args.variant}, eta={args.eta}')
+    log = []
+    with store:
+        if args.mode == 'halving':
+            best = successive_halving(store, candidates, list(candidates), args.min_folds, args.eta, log=log)
+        else:
+            best = hyperband(store, candidates, args.eta, np.random.default_rng(args.seed), log=log)
+
+    print('\nTop candidates (all folds):')
+    for name in best[:5]:
+        print(f'  {store.mean(name, n_folds):.4f}  {name}')
+    full = len(candidates) * n_folds
+    print(f'\nFits: {store.fits} vs {full} for the full grid ({1 - store.fits / full:.1%} saved)')
+
+    os.makedirs(os.path.dirname(results_path), exist_ok=True)
+    pd.DataFrame(log).to_csv(results_path, index=False)
+    print('Saved rung results to', results_path)
+
+
+if __name__ == '__main__':
+    main()
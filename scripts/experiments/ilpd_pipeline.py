@@ -0,0 +1,225 @@
+"""
+ILPD Logistic Regression vs Random Forest
+Script version of notebooks/ILPD_Colab_ML_Pipeline.ipynb: median/most-frequent
+imputation, scaling and one-hot encoding in a ColumnTransformer, then
+GridSearchCV (5-fold, F1) for a balanced LogisticRegression and the same
+search for a balanced RandomForest, and a held-out test evaluation.
+
+The RandomForest grid is scored with rf_warm_start.warm_start_grid: candidates
+that differ only in n_estimators share one warm-started forest per fold, which
+gives the same scores as refitting every candidate from scratch. Its
+class_weight='balanced' is applied as the explicit weights of each training
+fold (and of the training split for the final refit).
+
+The preprocessing step does not depend on any classifier hyperparameter, so
+the pipelines are built with a joblib Memory: the preprocessor is fit once per
+CV fold (plus once on the full training split) and every candidate of the
+GridSearchCV grids reuses those fits. The cache directory is trimmed to a size bound after
+each run. With --export both tuned pipelines are saved under results/models/
+for the inference server.
+"""
+
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import GridSearchCV, StratifiedKFold, train_test_split
+
+repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, os.path.join(repo_root, 'scripts', 'utils'))
+from dataset_cache import load_dataset
+from model_export import MODELS_DIR, save_model
+
+data_path = os.path.join(repo_root, 'data', 'raw', 'indian_liver_patient.csv')
+results_path = os.path.join(repo_root, 'results', 'ilpd_model_metrics.csv')
+threshold_path = os.path.join(repo_root, 'results', 'ilpd_threshold_analysis.csv')
+cache_dir = os.path.join(repo_root, 'results', 'cache', 'ilpd_preprocess')
+
+RANDOM_STATE = 42
+# y codes 0 / 1
+CLASSES = ['no_disease', 'liver_disease']
+
+SEARCHES = {
+    'Logistic Regression': ('lr', {'clf__C': [0.1, 1.0, 3.0, 10.0], 'clf__solver': ['liblinear', 'lbfgs']}),
+    'Random Forest': ('rf', {'clf__n_estimators': [100, 200], 'clf__max_depth': [None, 5, 10],
+                             'clf__min_samples_split': [2, 5]}),
+}
+
+
+def load_data(path=data_path):
+    df = load_dataset(path)
+    # Dataset: 1 = liver disease, 2 = no disease -> 1 / 0
+    y = df['Dataset'].map({1: 1, 2: 0}).astype(np.int64)
+    X = df.drop(columns=['Dataset'])
+    # categoricals from the dataset cache -> plain object columns for the imputer/encoder
+    for col in X.select_dtypes(include='category').columns:
+        X[col] = X[col].astype(object)
+    return X, y
+
+
+def build_preprocessor(numeric_features, categorical_features):
+    from sklearn.compose import ColumnTransformer
+    from sklearn.impute import SimpleImputer
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+    numeric = Pipeline([('imputer', SimpleImputer(strategy='median')), ('scaler', StandardScaler())])
+    categorical = Pipeline([('imputer', SimpleImputer(strategy='most_frequent')),
+                            ('onehot', OneHotEncoder(handle_unknown='ignore', sparse_output=False))])
+    return ColumnTransformer([('num', numeric, numeric_features), ('cat', categorical, categorical_features)],
+                             remainder='passthrough')
+
+
+def build_pipeline(kind, preprocessor, memory=None):
+    from sklearn.pipeline import Pipeline
+
+    if kind == 'lr':
+        from sklearn.linear_model import LogisticRegression
+        clf = LogisticRegression(class_weight='balanced', max_iter=500, random_state=RANDOM_STATE)
+    else:
+        from sklearn.ensemble import RandomForestClassifier
+        clf = RandomForestClassifier(class_weight='balanced', random_state=RANDOM_STATE)
+    # memory caches the fitted preprocess step keyed by its params and the fold's training rows
+    return Pipeline([('preprocess', preprocessor), ('clf', clf)], memory=memory)
+
+
+def warm_start_search(preprocessor, grid, X, y, cv):
+    """Best params and CV F1 of the RandomForest grid, from warm-started forests."""
+    from sklearn.metrics import f1_score
+
+    from rf_warm_start import balanced_class_weight, warm_start_grid
+
+    table, trained, from_scratch = warm_start_grid(build_pipeline('rf', preprocessor), grid, X, y, cv,
+                                                   metric=f1_score)
+    print(f'Trees trained: {trained} instead of {from_scratch} for the same grid from scratch')
+    # the first of equal scores, as GridSearchCV picks
+    best = table.loc[table['score_mean'].idxmax()]
+    # the CV scores used the balanced weights of each training fold as fixed dicts; refit the same way
+    params = dict(best['params'], clf__class_weight=balanced_class_weight(np.asarray(y)))
+    return params, best['score_mean']
+
+
+def preprocess_fits(memory):
+    """Number of distinct preprocessor fits stored in the joblib cache."""
+    # one directory per cached call under <location>/joblib/sklearn/pipeline/<fit function>/
+    root = os.path.join(memory.location, 'joblib', 'sklearn', 'pipeline')
+    if not os.path.isdir(root):
+        return 0
+    return sum(entry.is_dir() for func in os.scandir(root) if func.is_dir() for entry in os.scandir(func.path))
+
+
+def evaluate(name, model, X_test, y_test):
+    from sklearn.metrics import accuracy_score, matthews_corrcoef, precision_recall_fscore_support, roc_auc_score
+
+    y_pred = model.predict(X_test)
+    y_proba = model.predict_proba(X_test)[:, 1]
+    prec, rec, f1, _ = precision_recall_fscore_support(y_test, y_pred, labels=[1, 0], average=None)
+    row = {'Model': name, 'Accuracy': accuracy_score(y_test, y_pred), 'ROC_AUC': roc_auc_score(y_test, y_proba),
+           'MCC': matthews_corrcoef(y_test, y_pred), 'Precision_Disease': prec[0], 'Recall_Disease': rec[0],
+           'F1_Disease': f1[0]}
+    print('=' * 60)
+    print(f'{name.upper()} - Test Set Evaluation')
+    print('=' * 60)
+    print(f"  Accuracy: {row['Accuracy']:.3f}")
+    print(f"  ROC AUC:  {row['ROC_AUC']:.3f}")
+    print(f"  MCC:      {row['MCC']:.3f}")
+    print(f'  Liver Disease (1) - Precision: {prec[0]:.3f}, Recall: {rec[0]:.3f}, F1: {f1[0]:.3f}')
+    print(f'  No Disease (0)    - Precision: {prec[1]:.3f}, Recall: {rec[1]:.3f}, F1: {f1[1]:.3f}')
+    return row, y_proba
+
+
+def threshold_table(y_test, y_proba, thresholds=np.arange(0.20, 0.81, 0.05)):
+    from sklearn.metrics import precision_recall_fscore_support
+
+    rows = []
+    for thresh in thresholds:
+        prec, rec, f1, _ = precision_recall_fscore_support(y_test, (y_proba >= thresh).astype(int),
+                                                           average='binary', zero_division=0)
+        rows.append({'threshold': thresh, 'precision': prec, 'recall': rec, 'f1': f1})
+    return pd.DataFrame(rows)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='ILPD LR vs RF with cached per-fold preprocessing')
+    parser.add_argument('--data', default=data_path, help='indian_liver_patient.csv')
+    parser.add_argument('--no-cache', action='store_true', help='refit the preprocessor for every candidate')
+    parser.add_argument('--cache-dir', default=cache_dir)
+    parser.add_argument('--cache-size-mb', type=float, default=256, help='size bound of the preprocessing cache')
+    parser.add_argument('--n-jobs', type=int, default=-1)
+    parser.add_argument('--export', action='store_true', help='save the tuned pipelines for serving')
+    parser.add_argument('--models-dir', default=MODELS_DIR)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if not os.path.exists(args.data):
+        sys.exit(f'ILPD data not found at {args.data} (indian_liver_patient.csv from the UCI ILPD dataset)')
+    X, y = load_data(args.data)
+    print(f'Dataset loaded: {X.shape[0]} rows, {X.shape[1]} features')
+
+    numeric_features = X.select_dtypes(include='number').columns.tolist()
+    categorical_features = X.select_dtypes(exclude='number').columns.tolist()
+    preprocessor = build_preprocessor(numeric_features, categorical_features)
+
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, stratify=y,
+                                                        random_state=RANDOM_STATE)
+    cv = StratifiedKFold(n_splits=5, shuffle=True, random_state=RANDOM_STATE)
+
+    memory = None
+    if not args.no_cache:
+        from joblib import Memory
+        memory = Memory(args.cache_dir, verbose=0)
+
+    rows = []
+    probas = {}
+    # candidates and searches that went through GridSearchCV (and the preprocessing cache)
+    n_candidates = n_searches = 0
+    for name, (kind, grid) in SEARCHES.items():
+        print(f'Tuning {name}...')
+        if kind == 'rf':
+            best_params, best_score = warm_start_search(preprocessor, grid, X_train, y_train, cv)
+            model = build_pipeline(kind, preprocessor).set_params(**best_params).fit(X_train, y_train)
+        else:
+            search = GridSearchCV(build_pipeline(kind, preprocessor, memory), grid, cv=cv, scoring='f1',
+                                  n_jobs=args.n_jobs)
+            search.fit(X_train, y_train)
+            n_candidates += len(search.cv_results_['params'])
+            n_searches += 1
+            best_params, best_score = search.best_params_, search.best_score_
+            # the exported pipeline must not point at the local preprocessing cache
+            model = search.best_estimator_.set_params(memory=None)
+        print(f'Best parameters: {best_params}')
+        print(f'Best CV F1 score: {best_score:.4f}')
+        row, probas[name] = evaluate(name, model, X_test, y_test)
+        rows.append(row)
+        if args.export:
+            path = save_model(f'ilpd_{kind}', model, X_train, CLASSES, models_dir=args.models_dir,
+                              meta={'dataset': 'ilpd', 'classifier': name, 'params': best_params,
+                                    'cv_f1': best_score, 'test_roc_auc': row['ROC_AUC']})
+            print('Exported', path)
+
+    if memory is not None:
+        print(f'\nPreprocessor fits: {preprocess_fits(memory)} cached, '
+              f'instead of {n_candidates * cv.get_n_splits() + n_searches} without the cache')
+        memory.reduce_size(bytes_limit=int(args.cache_size_mb * 2**20))
+
+    comparison_df = pd.DataFrame(rows)
+    print('\nModel Comparison Summary:')
+    print(comparison_df.to_string(index=False))
+    os.makedirs(os.path.dirname(results_path), exist_ok=True)
+    comparison_df.to_csv(results_path, index=False)
+
+    thr_df = threshold_table(y_test, probas['Logistic Regression'])
+    print('\nThreshold Analysis (Logistic Regression, Liver Disease Class):')
+    print(thr_df.to_string(index=False, float_format='{:.3f}'.format))
+    print(f"\nOptimal threshold (max F1): {thr_df.loc[thr_df['f1'].idxmax(), 'threshold']:.2f}")
+    thr_df.to_csv(threshold_path, index=False)
+    print('\nSaved', results_path)
+    print('Saved', threshold_path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,384 @@
+"""
+Lab Experiment Engine
+Runs the variant x classifier x fold grid of the Weka lab on one persistent
+process pool. The raw feature matrix is copied once into shared memory; workers
+attach to it at startup instead of receiving a pickled copy with every fit.
+A LabEngine keeps that pool and memory for its lifetime, so repeated CV splits
+and successive calls (e.g. the rungs of a halving search) reuse them; run_grid
+is a one-shot LabEngine.
+
+Variants are preprocessing steps, not materialized copies: for each (split,
+variant, fold) the transformer is fit once on the training rows, the
+transformed train and test matrices are kept in their narrowest dtype (uint8
+for bin codes, float32 for continuous values), and every classifier for that
+fold is fit on them. Each process keeps the last few of these matrices, so a
+later call that needs the same fold again does not refit the transformer.
+
+When a ResultCache is given, cells whose inputs are unchanged are served from
+it and only the remaining fits are dispatched.
+
+Every fit and score call is timed (wall and CPU seconds) together with the
+worker's peak RSS during the cell and its growth over the RSS before fit, and
+each result carries Chrome trace events for its preprocessing, fit and score
+spans (see write_trace).
+"""
+
+import json
+import os
+import sys
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+import numpy as np
+from sklearn.base import clone
+from sklearn.metrics import accuracy_score
+
+from result_cache import ResultCache, describe_estimator, digest_array
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'utils'))
+from dataset_cache import compact_arrays
+
+# Per-process state, filled by _init_worker (in each pool worker, or locally when n_jobs=1)
+_state = {}
+# Transformed (split, variant, fold) matrices kept per process by default
+FOLD_MEMO_SIZE = 4
+
+
+def _to_shared(arr):
+    arr = np.ascontiguousarray(arr)
+    shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+    np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)[...] = arr
+    return shm, (shm.name, arr.shape, arr.dtype.str)
+
+
+def _attach(spec):
+    name, shape, dtype = spec
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+
+
+def _init_worker(specs, variants, classifiers, memo_size=FOLD_MEMO_SIZE):
+    _state['handles'] = []
+    _state['arrays'] = {}
+    for key, spec in specs.items():
+        shm, arr = _attach(spec)
+        _state['handles'].append(shm)
+        _state['arrays'][key] = arr
+    _state['variants'] = variants
+    _state['classifiers'] = classifiers
+    _state['fold_memo'] = OrderedDict()
+    _state['memo_size'] = memo_size
+
+
+def _reset_peak_rss():
+    """Restart the kernel's RSS high-water mark for this process (Linux); False if unsupported."""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def _status_mb(field):
+    """A memory field of /proc/self/status in MB (Linux); None if unavailable."""
+    try:
+        with open('/proc/self/status', 'r') as f:
+            for line in f:
+                if line.startswith(field + ':'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def rss_mb():
+    """Current RSS of this process (Linux); NaN if unknown."""
+    rss = _status_mb('VmRSS')
+    return float('nan') if rss is None else rss
+
+
+def peak_rss_mb():
+    """Peak RSS of this process since the last reset (Linux), else since it started; NaN if unknown."""
+    peak = _status_mb('VmHWM')
+    if peak is not None:
+        return peak
+    try:
+        import resource
+    except ImportError:
+        return float('nan')
+    # kilobytes on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 2**20 if sys.platform == 'darwin' else rss / 1024
+
+
+def trace_event(name, cat, start, seconds, **args):
+    """Chrome trace 'complete' event; start is time.time() so events of all workers line up."""
+    return {'name': name, 'cat': cat, 'ph': 'X', 'ts': start * 1e6, 'dur': seconds * 1e6,
+            'pid': os.getpid(), 'tid': 0, 'args': args}
+
+
+def write_trace(events, path):
+    """Write events as a Chrome trace (chrome://tracing, Perfetto, speedscope)."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+
+
+def fold_matrices(split, variant, fold):
+    """Train/test matrices of one fold, with the variant's transformer fit on the train rows only."""
+    memo = _state['fold_memo']
+    if (split, variant, fold) in memo:
+        memo.move_to_end((split, variant, fold))
+        return memo[(split, variant, fold)]
+    arrays = _state['arrays']
+    X, y = arrays['X'], arrays['y']
+    test = arrays['fold_of'][split] == fold
+    start, t0 = time.time(), time.perf_counter()
+    X_train, X_test = X[~test], X[test]
+    step = _state['variants'][variant]
+    if step is not None:
+        step = clone(step).fit(X_train, y[~test])
+        X_train, X_test = step.transform(X_train), step.transform(X_test)
+    X_train, X_test = compact_arrays(X_train, X_test)
+    mats = (X_train, y[~test], X_test, y[test])
+    _state['preprocess_event'] = trace_event(f'{variant} preprocess', 'preprocess', start,
+                                             time.perf_counter() - t0, variant=variant, fold=fold, repeat=split)
+    memo[(split, variant, fold)] = mats
+    if len(memo) > _state['memo_size']:
+        memo.popitem(last=False)
+    return mats
+
+
+def _run_fold(split, variant, fold, clf_names, return_model=False):
+    _state['preprocess_event'] = None
+    X_train, y_train, X_test, y_test = fold_matrices(split, variant, fold)
+    # only a memo miss records a preprocessing span; it goes with the unit's first result
+    events = [_state['preprocess_event']] if _state['preprocess_event'] else []
+    results = []
+    for clf_name in clf_names:
+        est = clone(_state['classifiers'][clf_name])
+        # the growth over the RSS before fit separates cells; the absolute peak is mostly interpreter
+        # and libraries. Without a reset the high-water mark is the process's, so there is no growth.
+        base = rss_mb() if _reset_peak_rss() else float('nan')
+        start, t0, c0 = time.time(), time.perf_counter(), time.process_time()
+        est.fit(X_train, y_train)
+        t1, c1 = time.perf_counter(), time.process_time()
+        acc = accuracy_score(y_test, est.predict(X_test))
+        t2, c2 = time.perf_counter(), time.process_time()
+        res = {'repeat': split, 'variant': variant, 'classifier': clf_name, 'fold': fold, 'accuracy': acc,
+               'fit_time_s': t1 - t0, 'fit_cpu_s': c1 - c0, 'score_time_s': t2 - t1, 'score_cpu_s': c2 - c1,
+               'peak_mem_mb': peak_rss_mb()}
+        res['peak_mem_delta_mb'] = res['peak_mem_mb'] - base
+        cell = {'repeat': split, 'variant': variant, 'classifier': clf_name, 'fold': fold}
+        res['trace'] = events + [trace_event(f'{clf_name} fit', 'fit', start, t1 - t0, cpu_s=c1 - c0, **cell),
+                                 trace_event(f'{clf_name} score', 'score', start + t1 - t0, t2 - t1,
+                                             cpu_s=c2 - c1, **cell)]
+        events = []
+        if return_model:
+            res['model'] = est
+        results.append(res)
+    return results
+
+
+def profile_cell(X, y, variants, classifiers, cv, variant, classifier, fold, path):
+    """Fit and score one cell in this process under cProfile; stats are dumped to `path`."""
+    import cProfile
+
+    arrays = _grid_arrays(X, y, [cv])
+    _state.update(arrays=arrays, variants=variants, classifiers=classifiers, handles=[], fold_memo=OrderedDict(),
+                  memo_size=FOLD_MEMO_SIZE)
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        res, = _run_fold(0, variant, fold, [classifier])
+    finally:
+        profiler.disable()
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    profiler.dump_stats(path)
+    return res
+
+
+def fold_assignments(cv, X, y):
+    """Return an int array giving the test fold of every row."""
+    fold_of = np.empty(len(y), dtype=np.int32)
+    for k, (_, test_idx) in enumerate(cv.split(X, y)):
+        fold_of[test_idx] = k
+    return fold_of
+
+
+def build_tasks(variants, classifiers, n_folds, n_splits=1):
+    return [(r, v, c, k) for r in range(n_splits) for v in variants for c in classifiers for k in range(n_folds)]
+
+
+def group_by_fold(tasks):
+    """Dispatch units: one per (split, variant, fold), carrying every classifier still to fit."""
+    units = OrderedDict()
+    for r, v, c, k in tasks:
+        units.setdefault((r, v, k), []).append(c)
+    return [(r, v, k, clfs) for (r, v, k), clfs in units.items()]
+
+
+def describe_variant(step):
+    return 'identity' if step is None else describe_estimator(step)
+
+
+def task_keys(key, arrays, variants, classifiers, tasks, seeds):
+    """Content key of every task: data bytes, variant config, estimator params, fold indices, seed."""
+    data_digest = digest_array(arrays['X'])
+    fold_digests = [digest_array(fold_of) for fold_of in arrays['fold_of']]
+    y_digest = digest_array(arrays['y'])
+    var_desc = {v: describe_variant(step) for v, step in variants.items()}
+    clf_desc = {c: describe_estimator(classifiers[c]) for c in {t[2] for t in tasks}}
+    return {t: key('lab-cell', data_digest, y_digest, t[1], var_desc[t[1]], clf_desc[t[2]],
+                   fold_digests[t[0]], t[3], seeds[t[0]])
+            for t in tasks}
+
+
+def _cache_entry(res):
+    return {k: v for k, v in res.items() if k not in ('repeat', 'variant', 'classifier', 'fold', 'trace')}
+
+
+def _grid_arrays(X, y, cvs):
+    X, = compact_arrays(np.asarray(X))
+    y = np.asarray(y)
+    # one row of test-fold numbers per CV split
+    return {'X': X, 'y': y, 'fold_of': np.stack([fold_assignments(cv, X, y) for cv in cvs])}
+
+
+def cell_keys(X, y, variants, classifiers, cv):
+    """(variant, classifier, fold) -> content key, the same key run_grid caches the cell under."""
+    arrays = _grid_arrays(X, y, [cv])
+    tasks = build_tasks(variants, classifiers, cv.get_n_splits())
+    keys = task_keys(ResultCache.key, arrays, variants, classifiers, tasks, [getattr(cv, 'random_state', None)])
+    return {t[1:]: k for t, k in keys.items()}
+
+
+def variant_footprint(X, y, variants):
+    """Bytes of each variant's transformed matrix (fit on all rows): float64 vs its compact dtype."""
+    X, = compact_arrays(np.asarray(X))
+    rows = []
+    for name, step in variants.items():
+        Xt = X if step is None else clone(step).fit(X, y).transform(X)
+        compact, = compact_arrays(Xt)
+        rows.append({'variant': name, 'dtype': str(compact.dtype), 'bytes': compact.nbytes,
+                     'float64_bytes': compact.size * 8, 'ratio': compact.size * 8 / max(compact.nbytes, 1)})
+    return rows
+
+
+class LabEngine:
+    """
+    Shared-memory data, process pool and fold memo for grids over one dataset.
+    `cvs` is a list of CV splitters (e.g. one per repeat), addressed by index in
+    tasks and results as 'repeat'. `classifiers` holds every estimator any
+    later run() may ask for. Use as a context manager, or call close().
+    """
+
+    def __init__(self, X, y, variants, classifiers, cvs, n_jobs=None, memo_size=FOLD_MEMO_SIZE):
+        self.arrays = _grid_arrays(X, y, cvs)
+        self.variants = variants
+        self.classifiers = classifiers
+        self.n_folds = [cv.get_n_splits() for cv in cvs]
+        self.seeds = [getattr(cv, 'random_state', None) for cv in cvs]
+        self.n_jobs = os.cpu_count() if n_jobs in (None, -1) else n_jobs
+        self.memo_size = memo_size
+        self._memo = OrderedDict()
+        self._handles = []
+        self._pool = None
+
+    def tasks(self, classifiers=None):
+        """Every (repeat, variant, classifier, fold) of the engine, optionally for some classifiers only."""
+        names = list(self.classifiers) if classifiers is None else list(classifiers)
+        return [(r, v, c, k) for r, n_folds in enumerate(self.n_folds)
+                for v in self.variants for c in names for k in range(n_folds)]
+
+    def _start_pool(self):
+        specs = {}
+        for key, arr in self.arrays.items():
+            shm, specs[key] = _to_shared(arr)
+            self._handles.append(shm)
+        self._pool = ProcessPoolExecutor(max_workers=self.n_jobs, initializer=_init_worker,
+                                         initargs=(specs, self.variants, self.classifiers, self.memo_size))
+
+    def run(self, classifiers=None, cache=None, store_models=False, skip=()):
+        """
+        Fit every task of tasks(classifiers) not in `skip` and yield one result dict per
+        fit as soon as its fold finishes. With a `cache`, hits are yielded first (marked
+        'cached') and new results are written back; `store_models` also keeps the fitted
+        estimator in each entry.
+        """
+        skip = set(skip)
+        tasks = [t for t in self.tasks(classifiers) if t not in skip]
+        if not tasks:
+            return
+
+        keys = {}
+        if cache is not None:
+            keys = task_keys(cache.key, self.arrays, self.variants, self.classifiers, tasks, self.seeds)
+            pending = []
+            for task in tasks:
+                entry = cache.get(keys[task])
+                if entry is None or (store_models and 'model' not in entry):
+                    pending.append(task)
+                else:
+                    yield dict(entry, repeat=task[0], variant=task[1], classifier=task[2], fold=task[3],
+                               cached=True)
+            tasks = pending
+            if not tasks:
+                return
+
+        def finish(results):
+            for res in results:
+                if cache is not None:
+                    cache.put(keys[(res['repeat'], res['variant'], res['classifier'], res['fold'])],
+                              _cache_entry(res))
+                yield res
+
+        units = group_by_fold(tasks)
+        if self.n_jobs == 1:
+            _state.update(arrays=self.arrays, variants=self.variants, classifiers=self.classifiers,
+                          handles=[], fold_memo=self._memo, memo_size=self.memo_size)
+            for unit in units:
+                yield from finish(_run_fold(*unit, return_model=store_models))
+            return
+
+        if self._pool is None:
+            self._start_pool()
+        futures = [self._pool.submit(_run_fold, *unit, return_model=store_models) for unit in units]
+        try:
+            for fut in as_completed(futures):
+                yield from finish(fut.result())
+        finally:
+            # drop queued fits if the caller stops consuming early
+            for fut in futures:
+                fut.cancel()
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+        for shm in self._handles:
+            shm.close()
+            shm.unlink()
+        self._handles = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def run_grid(X, y, variants, classifiers, cv, n_jobs=None, cache=None, store_models=False, skip=()):
+    """
+    Fit every (variant, classifier, fold) cell of one CV split and yield one result
+    dict per fit as soon as its fold finishes. `variants` maps name -> unfitted
+    transformer (or None for the raw features); the folds are computed once from
+    `cv` and shared by all variants and classifiers. Cells listed in `skip` (e.g.
+    already in a result log) are left out. See LabEngine.run for `cache` and
+    `store_models`.
+    """
+    with LabEngine(X, y, variants, classifiers, [cv], n_jobs=n_jobs) as engine:
+        yield from engine.run(cache=cache, store_models=store_models, skip={(0,) + tuple(t) for t in skip})
@@ -0,0 +1,285 @@
+"""
+Pipeline Benchmark
+Times every stage of the lab pipeline on synthetic data with the diabetes
+schema over a grid of row and feature counts:
+
+    generate        synthesize the frame (the 8 diabetes columns + extra ones)
+    load_cold       parse the CSV and build the columnar cache (load_dataset)
+    load_warm       reload from the columnar cache
+    preprocess:<v>  fit_transform of each lab variant on all rows
+    fit:<c>         fit of each registry classifier (with SMO_linear) on an 80% split
+    predict:<c>     predict on the remaining 20%
+    cv_grid         5-fold run_grid (variants x fast classifiers), per n_jobs
+    compare         corrected resampled t-tests on the cv_grid fold scores
+    aggregate       group_stats by class (mean, std, median, corr)
+    render          class-coloured scatter (density raster on large frames)
+
+Synthetic rows draw the class with the real prior and each diabetes column
+from the real values of that class; extra columns are noisy linear mixtures
+of the diabetes ones. A stage is skipped once its time projected from the
+smaller sizes (with the scaling exponent seen so far) exceeds --stage-budget,
+so the table shows where each stage stops scaling. Each stage is timed up to
+--repeats times and the best time is kept, with the spread of the runs.
+
+Results go to results/benchmarks/pipeline_benchmark.csv. --save-baseline keeps
+them as the baseline; --check compares against it and exits non-zero on a
+regression: a stage slower by more than --tolerance and by more than
+--min-delta seconds and twice the larger spread of the two timings.
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, os.path.join(repo_root, 'scripts', 'utils'))
+sys.path.insert(0, os.path.join(repo_root, 'scripts', 'analysis'))
+bench_dir = os.path.join(repo_root, 'results', 'benchmarks')
+results_path = os.path.join(bench_dir, 'pipeline_benchmark.csv')
+baseline_path = os.path.join(bench_dir, 'baseline.csv')
+
+BASE_COLUMNS = ['preg', 'plas', 'pres', 'skin', 'insu', 'mass', 'pedi', 'age']
+INTEGER_COLUMNS = {'preg', 'plas', 'pres', 'skin', 'insu', 'age'}
+CV_VARIANTS = ['original', 'normalized']
+CV_CLASSIFIERS = ['NaiveBayes', 'J48', 'Logistic']
+KEY = ['stage', 'rows', 'features', 'n_jobs']
+# runs per stage even past --repeat-time (unless --repeats is lower)
+MIN_REPEATS = 3
+
+
+def synthesize(X, y, n_rows, n_features, seed=0):
+    """Frame with the diabetes columns, n_features - 8 extra columns and a 'class' column."""
+    rng = np.random.default_rng(seed)
+    X = X[BASE_COLUMNS].to_numpy(dtype=np.float64)
+    y = np.asarray(y)
+    cls = rng.choice(y, n_rows)
+    base = np.empty((n_rows, len(BASE_COLUMNS)))
+    for k in np.unique(y):
+        rows = np.flatnonzero(cls == k)
+        pool = X[y == k]
+        # every column resampled independently within the class
+        base[rows] = pool[rng.integers(0, len(pool), (len(rows), pool.shape[1])), np.arange(pool.shape[1])]
+    for j, col in enumerate(BASE_COLUMNS):
+        if col in INTEGER_COLUMNS:
+            base[:, j] = np.maximum(base[:, j] + rng.integers(-1, 2, n_rows), 0)
+        else:
+            base[:, j] *= rng.normal(1.0, 0.02, n_rows)
+    df = pd.DataFrame(base, columns=BASE_COLUMNS)
+    n_extra = max(0, n_features - len(BASE_COLUMNS))
+    if n_extra:
+        scaled = (base - base.mean(axis=0)) / base.std(axis=0)
+        weights = rng.normal(size=(len(BASE_COLUMNS), n_extra)) / np.sqrt(len(BASE_COLUMNS))
+        extra = (scaled @ weights + rng.normal(size=(n_rows, n_extra))).astype(np.float32)
+        df = pd.concat([df, pd.DataFrame(extra, columns=[f'x{j:03d}' for j in range(n_extra)])], axis=1)
+    df['class'] = np.where(cls == 1, 'tested_positive', 'tested_negative')
+    return df
+
+
+def projected(history, rows):
+    """Time at `rows` extrapolated from earlier sizes; exponent from the last two points, at least 1."""
+    if not history:
+        return 0.0
+    (n1, t1), (n0, t0) = history[-1], history[-2] if len(history) > 1 else (0, 0)
+    exponent = 1.0
+    if n0 and t0 > 0.01 and t1 > 0.01:
+        exponent = max(1.0, np.log(t1 / t0) / np.log(n1 / n0))
+    return t1 * (rows / n1) ** exponent
+
+
+class Bench:
+    def __init__(self, budget, repeats=5, repeat_time=2.0):
+        self.budget = budget
+        self.repeats = repeats
+        self.repeat_time = repeat_time
+        self.records = []
+        # (stage, features, n_jobs) -> [(rows, seconds)] of completed runs
+        self.history = {}
+
+    def run(self, stage, rows, features, fn, n_jobs=1, setup=None):
+        """
+        Time fn() unless the projected time is over budget; returns fn's result or None if skipped.
+        Like timeit, fn runs up to `repeats` times (at least MIN_REPEATS, more only while under
+        `repeat_time` seconds) and the best time is kept; spread is the max - min of the runs. setup() runs untimed before each call.
+        """
+        history = self.history.setdefault((stage, features, n_jobs), [])
+        estimate = projected(history, rows)
+        record = {'stage': stage, 'rows': rows, 'features': features, 'n_jobs': n_jobs}
+        if estimate > self.budget:
+            self.records.append(dict(record, seconds=np.nan, spread=np.nan, repeats=0,
+                                     status=f'skipped: projected {estimate:.0f}s'))
+            print(f'  {stage:<24} skipped (projected {estimate:.0f}s)')
+            return None
+        times = []
+        while len(times) < self.repeats and (len(times) < MIN_REPEATS or sum(times) < self.repeat_time):
+            if setup is not None:
+                setup()
+            start = time.perf_counter()
+            out = fn()
+            times.append(time.perf_counter() - start)
+        seconds = min(times)
+        spread = max(times) - seconds if len(times) > 1 else np.nan
+        history.append((rows, seconds))
+        self.records.append(dict(record, seconds=seconds, spread=spread, repeats=len(times), status='ok'))
+        print(f'  {stage:<24} {seconds:9.3f}s  best of {len(times)}' +
+              (f'  n_jobs={n_jobs}' if n_jobs != 1 else ''))
+        return out
+
+
+def _render(df, path):
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    from plot_pipeline import scatter_by_hue
+
+    fig, ax = plt.subplots(figsize=(6, 5))
+    scatter_by_hue(ax, df, 'plas', 'mass', 'class')
+    fig.savefig(path)
+    plt.close(fig)
+
+
+def bench_size(bench, X_real, y_real, n_rows, n_features, n_jobs_list, work_dir):
+    from sklearn.base import clone
+    from sklearn.model_selection import StratifiedKFold, train_test_split
+
+    from comparison import significance_table
+    from dataset_cache import load_dataset
+    from group_stats import Stat, compute
+    from lab_engine import run_grid
+    from weka_lab import CLASSIFIERS, build_classifiers, build_variants
+
+    print(f'{n_rows} rows x {n_features} features')
+    size = (n_rows, n_features)
+    df = bench.run('generate', *size, lambda: synthesize(X_real, y_real, n_rows, n_features))
+    csv_path = os.path.join(work_dir, f'synth_{n_rows}x{n_features}.csv')
+    df.to_csv(csv_path, index=False)
+    cache_root = os.path.join(work_dir, 'cache')
+    loaded = bench.run('load_cold', *size, lambda: load_dataset(csv_path, cache_root=cache_root),
+                       setup=lambda: shutil.rmtree(cache_root, ignore_errors=True))
+    if loaded is not None:
+        bench.run('load_warm', *size, lambda: load_dataset(csv_path, cache_root=cache_root))
+
+    X = df.drop(columns=['class']).to_numpy(dtype=np.float32)
+    y = (df['class'] == 'tested_positive').to_numpy(dtype=np.int64)
+    for name, step in build_variants().items():
+        if step is not None:
+            bench.run(f'preprocess:{name}', *size, lambda: clone(step).fit_transform(X, y))
+
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, stratify=y, random_state=0)
+    for name, est in build_classifiers(list(CLASSIFIERS)).items():
+        model = bench.run(f'fit:{name}', *size, lambda: clone(est).fit(X_train, y_train))
+        if model is not None:
+            bench.run(f'predict:{name}', *size, lambda: model.predict(X_test))
+
+    cv = StratifiedKFold(n_splits=5, shuffle=True, random_state=0)
+    variants = {name: step for name, step in build_variants().items() if name in CV_VARIANTS}
+    classifiers = build_classifiers(CV_CLASSIFIERS)
+    results = None
+    for n_jobs in n_jobs_list:
+        results = bench.run('cv_grid', *size, lambda: list(run_grid(X, y, variants, classifiers, cv,
+                                                                      n_jobs=n_jobs)), n_jobs=n_jobs) or results
+    if results:
+        scores = np.full((len(variants), len(classifiers), 1, cv.get_n_splits()), np.nan)
+        for res in results:
+            scores[list(variants).index(res['variant']), list(classifiers).index(res['classifier']), 0,
+                   res['fold']] = res['accuracy']
+        bench.run('compare', *size, lambda: significance_table(scores, list(variants), list(classifiers), 1 / 4))
+
+    requests = [Stat('class', col, stat) for col in BASE_COLUMNS for stat in ('mean', 'std')]
+    requests += [Stat('class', col, 'quantile', 0.5) for col in BASE_COLUMNS]
+    requests += [Stat(None, 'plas', 'corr', 'mass')]
+    bench.run('aggregate', *size, lambda: compute(df, requests))
+    bench.run('render', *size, lambda: _render(df, os.path.join(work_dir, 'render.png')))
+
+
+def check(results, baseline, tolerance, min_delta, noise=2.0):
+    """
+    Rows of `results` slower than baseline by more than tolerance (relative) and by more than
+    min_delta seconds and `noise` times the larger spread of the two measurements.
+    """
+    if 'spread' not in baseline:
+        baseline = baseline.assign(spread=np.nan)
+    merged = results.merge(baseline[KEY + ['seconds', 'spread']], on=KEY, suffixes=('', '_baseline'))
+    merged = merged.dropna(subset=['seconds', 'seconds_baseline'])
+    merged['ratio'] = merged['seconds'] / merged['seconds_baseline']
+    margin = np.maximum(min_delta, noise * merged[['spread', 'spread_baseline']].max(axis=1).fillna(0))
+    slower = (merged['ratio'] > 1 + tolerance) & (merged['seconds'] - merged['seconds_baseline'] > margin)
+    return merged, merged[slower]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Time each lab pipeline stage on synthetic diabetes-shaped data')
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000, 10_000, 100_000],
+                        help='row counts (up to 10_000_000)')
+    parser.add_argument('--features', type=int, nargs='+', default=[8, 64], help='feature counts (8-500)')
+    parser.add_argument('--n-jobs', type=int, nargs='+', default=[1, -1], help='n_jobs settings for cv_grid')
+    parser.add_argument('--stage-budget', type=float, default=60.0,
+                        help='skip a stage once its projected time exceeds this many seconds')
+    parser.add_argument('--max-values', type=float, default=2e8,
+                        help='skip sizes whose rows x features exceed this (memory bound)')
+    parser.add_argument('--out', default=results_path)
+    parser.add_argument('--baseline', default=baseline_path)
+    parser.add_argument('--save-baseline', action='store_true', help='store this run as the baseline')
+    parser.add_argument('--check', action='store_true', help='compare with the baseline; exit 1 on regressions')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed relative slowdown')
+    parser.add_argument('--min-delta', type=float, default=0.1,
+                        help='ignore slowdowns below this many seconds or twice the timing spread')
+    parser.add_argument('--repeats', type=int, default=5, help='runs per stage; the best time is kept')
+    parser.add_argument('--repeat-time', type=float, default=2.0,
+                        help='stop repeating a stage once its runs took this many seconds')
+    parser.add_argument('--keep-data', action='store_true', help='keep the synthetic CSVs and caches')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    from weka_lab import load_data
+
+    args = parse_args(argv)
+    X_real, y_real = load_data()
+    work_dir = os.path.join(bench_dir, 'data')
+    os.makedirs(work_dir, exist_ok=True)
+    bench = Bench(args.stage_budget, args.repeats, args.repeat_time)
+    try:
+        for n_features in sorted(args.features):
+            for n_rows in sorted(args.rows):
+                if n_rows * n_features > args.max_values:
+                    bench.records.append({'stage': 'all', 'rows': n_rows, 'features': n_features, 'n_jobs': 1,
+                                          'seconds': np.nan, 'spread': np.nan, 'repeats': 0,
+                                          'status': 'skipped: over --max-values'})
+                    print(f'{n_rows} rows x {n_features} features: skipped (over --max-values)')
+                    continue
+                bench_size(bench, X_real, y_real, n_rows, n_features, args.n_jobs, work_dir)
+    finally:
+        if not args.keep_data:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    results = pd.DataFrame(bench.records)
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    results.to_csv(args.out, index=False)
+    print('\nSaved', args.out)
+    timed = results[results['status'] == 'ok']
+    print('\nSeconds per stage (rows across):')
+    print(timed.pivot_table(index=['features', 'stage', 'n_jobs'], columns='rows', values='seconds', aggfunc='min',
+                            sort=False).to_string(float_format='{:.3f}'.format))
+
+    if args.save_baseline:
+        results.to_csv(args.baseline, index=False)
+        print('Saved baseline', args.baseline)
+    if args.check:
+        if not os.path.exists(args.baseline):
+            sys.exit(f'No baseline at {args.baseline}; run with --save-baseline first')
+        compared, regressions = check(results, pd.read_csv(args.baseline), args.tolerance, args.min_delta)
+        print(f'\nBaseline check: {len(compared)} timings compared, {len(regressions)} regressions')
+        if len(regressions):
+            columns = KEY + ['seconds_baseline', 'seconds', 'spread', 'ratio']
+            print(regressions[columns].to_string(index=False, float_format='{:.3f}'.format))
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""
+Content-Addressed Result Cache
+Stores per-fold lab results on disk under a hash of everything that decides
+the outcome of a fit (data bytes, variant config, estimator params, fold
+indices, seed), so re-running the lab only refits cells that changed.
+Entries are evicted least-recently-used once the cache exceeds its size bound.
+"""
+
+import hashlib
+import os
+import pickle
+import time
+
+import numpy as np
+
+
+def digest_array(arr):
+    arr = np.ascontiguousarray(arr)
+    h = hashlib.sha256()
+    h.update(f'{arr.dtype.str}{arr.shape}'.encode())
+    h.update(arr.tobytes())
+    return h.hexdigest()
+
+
+def describe_estimator(est):
+    """Stable text form of an estimator's class and full get_params()."""
+    params = sorted(est.get_params(deep=True).items())
+    # nested estimators show up both as objects and as flattened params; keep only the flat ones
+    params = [(k, v) for k, v in params if not hasattr(v, 'get_params')]
+    return f'{type(est).__module__}.{type(est).__qualname__}{params!r}'
+
+
+class ResultCache:
+    def __init__(self, cache_dir, max_bytes=512 * 2**20, rebuild=False):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.rebuild = rebuild
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+        # path -> [last_used, size]; mtime doubles as the LRU clock across runs
+        self._entries = {}
+        for root, _, files in os.walk(cache_dir):
+            for fname in files:
+                if fname.endswith('.pkl'):
+                    path = os.path.join(root, fname)
+                    st = os.stat(path)
+                    self._entries[path] = [st.st_mtime, st.st_size]
+        self._total = sum(size for _, size in self._entries.values())
+
+    @staticmethod
+    def key(*parts):
+        h = hashlib.sha256()
+        for part in parts:
+            h.update(repr(part).encode())
+            h.update(b'\0')
+        return h.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], key + '.pkl')
+
+    def get(self, key):
+        path = self._path(key)
+        if self.rebuild or path not in self._entries:
+            self.misses += 1
+            return None
+        try:
+            with open(path, 'rb') as f:
+                entry = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            self._forget(path)
+            self.misses += 1
+            return None
+        now = time.time()
+        os.utime(path, (now, now))
+        self._entries[path][0] = now
+        self.hits += 1
+        return entry
+
+    def put(self, key, entry):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f'{path}.{os.getpid()}.tmp'
+        with open(tmp, 'wb') as f:
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+        if path in self._entries:
+            self._total -= self._entries[path][1]
+        size = os.path.getsize(path)
+        self._entries[path] = [time.time(), size]
+        self._total += size
+        self._evict()
+
+    def _forget(self, path):
+        _, size = self._entries.pop(path)
+        self._total -= size
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _evict(self):
+        if self._total <= self.max_bytes:
+            return
+        for path, _ in sorted(self._entries.items(), key=lambda kv: kv[1][0]):
+            if self._total <= self.max_bytes:
+                break
+            self._forget(path)
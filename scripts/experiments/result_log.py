@@ -0,0 +1,55 @@
+"""
+Append-Only Result Log
+One JSON object per line for every finished (repeat, variant, classifier, fold)
+cell, written and flushed as soon as the fit returns. Each record carries the
+cell's content key (see lab_engine.cell_keys), so a restarted run can reuse
+every cell that is already logged for the same data, config and folds, and
+only fit the rest. A line cut short by an interrupted write is ignored.
+"""
+
+import json
+import os
+
+
+class ResultLog:
+    def __init__(self, path, fresh=False):
+        self.path = path
+        # content key -> record
+        self.records = {}
+        self.skipped_lines = 0
+        torn = False
+        if fresh and os.path.exists(path):
+            os.remove(path)
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    torn = not line.endswith('\n')
+                    if not line.strip():
+                        continue
+                    try:
+                        record = json.loads(line)
+                        self.records[record['key']] = record
+                    except (ValueError, KeyError):
+                        self.skipped_lines += 1
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._f = open(path, 'a', encoding='utf-8')
+        if torn:
+            # a torn last line must not swallow the next record
+            self._f.write('\n')
+
+    def get(self, key):
+        return self.records.get(key)
+
+    def append(self, record):
+        self._f.write(json.dumps(record) + '\n')
+        self._f.flush()
+        self.records[record['key']] = record
+
+    def close(self):
+        self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
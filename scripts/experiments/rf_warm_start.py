@@ -0,0 +1,104 @@
+"""
+Warm-Start RandomForest Sweeps
+Grows each fold's forest once with warm_start instead of retraining from zero
+for every tree count. Because sklearn draws tree seeds from the same stream on
+warm start, the first k trees of a grown forest are exactly the forest a fresh
+fit with n_estimators=k would build, so one pass per fold scores every tree
+count (and every grid point that differs only in n_estimators).
+class_weight='balanced' is replaced by the explicit weights it gives on each
+fold's training labels, so every tree of a grown forest uses the same weights.
+"""
+
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.metrics import accuracy_score
+from sklearn.model_selection import ParameterGrid
+from sklearn.utils.class_weight import compute_class_weight
+
+
+def balanced_class_weight(y):
+    """The class -> weight dict that class_weight='balanced' computes from labels y."""
+    classes = np.unique(y)
+    return dict(zip(classes.tolist(), compute_class_weight('balanced', classes=classes, y=y).tolist()))
+
+
+def forest_curve_fold(estimator, X_train, y_train, X_test, y_test, n_trees, metric=accuracy_score):
+    """
+    Score the forest on one fold at every tree count from 1 to max(n_trees).
+    The forest is grown with warm_start through the counts in `n_trees`; each
+    new tree's class probabilities are added to a running sum, which is what
+    RandomForestClassifier.predict_proba averages over.
+    """
+    forest = clone(estimator).set_params(warm_start=True)
+    if isinstance(forest.class_weight, str) and forest.class_weight == 'balanced':
+        forest.set_params(class_weight=balanced_class_weight(y_train))
+    proba_sum = None
+    scores = []
+    for n in sorted(set(n_trees)):
+        forest.set_params(n_estimators=n).fit(X_train, y_train)
+        for tree in forest.estimators_[len(scores):n]:
+            proba = tree.predict_proba(X_test)
+            proba_sum = proba if proba_sum is None else proba_sum + proba
+            pred = forest.classes_[np.argmax(proba_sum, axis=1)]
+            scores.append(metric(y_test, pred))
+    return np.array(scores)
+
+
+def forest_curve(estimator, X, y, cv, n_trees=(100, 200), metric=accuracy_score):
+    """Metric vs number of trees over all CV folds, from one warm-started pass per fold."""
+    X, y = np.asarray(X), np.asarray(y)
+    curves = np.array([forest_curve_fold(estimator, X[train], y[train], X[test], y[test], n_trees, metric)
+                       for train, test in cv.split(X, y)])
+    return pd.DataFrame({'n_trees': np.arange(1, curves.shape[1] + 1),
+                         'score_mean': curves.mean(axis=0),
+                         'score_std': curves.std(axis=0)})
+
+
+def _fold_data(estimator, X, y, cv):
+    """Per-fold (X_train, y_train, X_test, y_test); a Pipeline's steps before the forest are fit per fold."""
+    folds = []
+    for train, test in cv.split(X, y):
+        X_train, X_test = (X.iloc[train], X.iloc[test]) if hasattr(X, 'iloc') else (X[train], X[test])
+        y_train, y_test = y[train], y[test]
+        if hasattr(estimator, 'steps'):
+            steps = clone(estimator[:-1]).fit(X_train, y_train)
+            X_train, X_test = steps.transform(X_train), steps.transform(X_test)
+        folds.append((X_train, y_train, X_test, y_test))
+    return folds
+
+
+def warm_start_grid(estimator, param_grid, X, y, cv, metric=accuracy_score):
+    """
+    Evaluate a RandomForest parameter grid where configs that differ only in
+    n_estimators share one grown forest per fold. Returns a results frame in
+    the grid's order and the number of trees trained vs a from-scratch grid.
+    `estimator` may also be a Pipeline ending in the forest, with grid keys
+    prefixed by the step name as in GridSearchCV; the other steps must not be
+    in the grid and are fit once per fold.
+    """
+    prefix = estimator.steps[-1][0] + '__' if hasattr(estimator, 'steps') else ''
+    forest = estimator.steps[-1][1] if prefix else estimator
+    grid = dict(param_grid)
+    if any(not key.startswith(prefix) for key in grid):
+        raise ValueError(f'warm_start_grid only searches parameters of the forest ({prefix}*)')
+    n_key = prefix + 'n_estimators'
+    n_values = sorted(grid.pop(n_key, [forest.n_estimators]))
+    y = np.asarray(y)
+    folds = _fold_data(estimator, X, y, cv)
+
+    curves = {}
+    for params in ParameterGrid(grid):
+        est = clone(forest).set_params(**{key[len(prefix):]: value for key, value in params.items()})
+        curves[tuple(sorted(params.items()))] = np.array([forest_curve_fold(est, *fold, n_values, metric)
+                                                          for fold in folds])
+    # GridSearchCV's candidate order; 'params' holds each candidate's settings as in cv_results_
+    rows = []
+    for params in ParameterGrid(dict(grid, **{n_key: n_values})):
+        scores = curves[tuple(sorted((k, v) for k, v in params.items() if k != n_key))][:, params[n_key] - 1]
+        rows.append(dict(params, score_mean=scores.mean(), score_std=scores.std(), params=params))
+
+    n_combos = len(ParameterGrid(grid))
+    trained = n_combos * len(folds) * max(n_values)
+    from_scratch = n_combos * len(folds) * sum(n_values)
+    return pd.DataFrame(rows), trained, from_scratch
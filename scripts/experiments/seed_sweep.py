@@ -0,0 +1,147 @@
+"""
+Seed Sweep Variance Study
+Estimates run-to-run variance of any lab classifier on any variant by repeating
+the full 10-fold CV with a fresh seed (CV shuffle + estimator random_state).
+Seeds run on a process pool; a running mean/std (Welford) and a t-based
+confidence interval are updated as each seed finishes, and the sweep stops once
+the interval is narrower than the requested tolerance.
+"""
+
+import argparse
+import math
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+from sklearn.base import clone
+from sklearn.model_selection import StratifiedKFold
+
+from lab_engine import run_grid
+
+# Per-process data, filled by _init_worker
+_data = {}
+
+
+class RunningStats:
+    """Welford's online mean/variance."""
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def add(self, x):
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self._m2 += delta * (x - self.mean)
+
+    @property
+    def std(self):
+        return math.sqrt(self._m2 / (self.n - 1)) if self.n > 1 else float('nan')
+
+    def ci(self, confidence=0.95):
+        if self.n < 2:
+            return (float('-inf'), float('inf'))
+        from scipy import stats
+
+        half = stats.t.ppf((1 + confidence) / 2, self.n - 1) * self.std / math.sqrt(self.n)
+        return (self.mean - half, self.mean + half)
+
+    def ci_width(self, confidence=0.95):
+        lo, hi = self.ci(confidence)
+        return hi - lo
+
+
+def _init_worker(X, y, variant, step, clf_name, estimator, n_splits):
+    _data.update(X=X, y=y, variant=variant, step=step, clf_name=clf_name,
+                 estimator=estimator, n_splits=n_splits)
+
+
+def _run_seed(seed):
+    est = clone(_data['estimator'])
+    if 'random_state' in est.get_params():
+        est = est.set_params(random_state=seed)
+    cv = StratifiedKFold(n_splits=_data['n_splits'], shuffle=True, random_state=seed)
+    scores = [res['accuracy'] for res in run_grid(_data['X'], _data['y'], {_data['variant']: _data['step']},
+                                                   {_data['clf_name']: est}, cv, n_jobs=1)]
+    return seed, float(np.mean(scores))
+
+
+def sweep(X, y, estimator, step=None, variant='original', clf_name='clf', tol=0.005,
+          confidence=0.95, min_seeds=3, max_seeds=100, first_seed=1, n_splits=10, n_jobs=None):
+    """
+    Run seeds first_seed, first_seed+1, ... until the CI of the mean CV accuracy
+    is narrower than `tol` (or `max_seeds` is reached). Yields (seed, accuracy,
+    RunningStats) in seed order so the result does not depend on worker timing.
+    """
+    n_jobs = os.cpu_count() if n_jobs in (None, -1) else n_jobs
+    running = RunningStats()
+    seeds = iter(range(first_seed, first_seed + max_seeds))
+    done = {}
+    next_seed = first_seed
+    pool = ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker,
+                               initargs=(np.asarray(X), np.asarray(y), variant, step, clf_name,
+                                         estimator, n_splits))
+    try:
+        pending = {pool.submit(_run_seed, seed) for _, seed in zip(range(n_jobs), seeds)}
+        while pending:
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in finished:
+                seed, acc = fut.result()
+                done[seed] = acc
+            # fold results into the running stats strictly in seed order
+            while next_seed in done:
+                acc = done.pop(next_seed)
+                running.add(acc)
+                yield next_seed, acc, running
+                next_seed += 1
+                if running.n >= min_seeds and running.ci_width(confidence) < tol:
+                    return
+            for _ in finished:
+                seed = next(seeds, None)
+                if seed is not None:
+                    pending.add(pool.submit(_run_seed, seed))
+    finally:
+        pool.shutdown(cancel_futures=True)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Seed sweep with CI-based early stopping')
+    parser.add_argument('--classifier', default='RandomForest')
+    parser.add_argument('--variant', default='original')
+    parser.add_argument('--tol', type=float, default=0.005, help='stop once the CI width (accuracy, 0-1) is below this')
+    parser.add_argument('--confidence', type=float, default=0.95)
+    parser.add_argument('--min-seeds', type=int, default=3)
+    parser.add_argument('--max-seeds', type=int, default=100)
+    parser.add_argument('--n-jobs', type=int, default=-1)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    from weka_lab import build_classifiers, build_variants, load_data
+
+    args = parse_args(argv)
+    X, y = load_data()
+    estimator = build_classifiers([args.classifier])[args.classifier]
+    step = build_variants()[args.variant]
+
+    print(f'Seed sweep: {args.classifier} on {args.variant} '
+          f'(stop when {args.confidence:.0%} CI width < {args.tol * 100:.2f}%)')
+    print('-' * 70)
+    running = None
+    for seed, acc, running in sweep(X, y, estimator, step, args.variant, args.classifier, tol=args.tol,
+                                    confidence=args.confidence, min_seeds=args.min_seeds,
+                                    max_seeds=args.max_seeds, n_jobs=args.n_jobs):
+        print(f'  seed={seed:<4d} accuracy: {acc * 100:.4f}%   running mean: {running.mean * 100:.4f}%   '
+              f'CI width: {running.ci_width(args.confidence) * 100:.4f}%')
+
+    lo, hi = running.ci(args.confidence)
+    print(f'\n  Seeds used: {running.n}')
+    print(f'  Mean:       {running.mean * 100:.4f}%')
+    print(f'  Std Dev:    {running.std * 100:.4f}%')
+    print(f'  {args.confidence:.0%} CI:     [{lo * 100:.4f}%, {hi * 100:.4f}%]')
+
+
+if __name__ == '__main__':
+    main()
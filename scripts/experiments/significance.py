@@ -0,0 +1,52 @@
+"""
+Significance Comparison
+Tests every classifier pair of every variant from the lab's per-fold scores
+(results/weka_lab_folds.csv) with the corrected resampled t-test used by the
+Weka Experimenter, alongside a plain paired t-test, and ranks the classifiers
+by significant wins minus losses.
+"""
+
+import argparse
+import os
+
+import comparison
+
+repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+out_path = os.path.join(repo_root, 'results', 'significance_tests.csv')
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Corrected resampled t-tests across all classifier pairs')
+    parser.add_argument('--folds', default=comparison.FOLDS_PATH, help='per-fold score log written by weka_lab.py')
+    parser.add_argument('--alpha', type=float, default=0.05)
+    parser.add_argument('--test-train-ratio', type=float, default=None,
+                        help='n_test / n_train of one fold (default: 1 / (k - 1) for k-fold CV)')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    scores, variants, classifiers = comparison.load_fold_scores(args.folds)
+    n_folds = scores.shape[3]
+    ratio = args.test_train_ratio if args.test_train_ratio is not None else 1 / (n_folds - 1)
+
+    table = comparison.significance_table(scores, variants, classifiers, ratio, alpha=args.alpha)
+    ranks = comparison.ranking(table)
+
+    print('=' * 90)
+    print(f'CORRECTED RESAMPLED T-TEST ({scores.shape[2]} x {n_folds}-fold CV, alpha={args.alpha})')
+    print('=' * 90)
+    for variant in variants:
+        print(f'\n{variant.capitalize()} Dataset:')
+        print('-' * 90)
+        print(table[table['variant'] == variant].drop(columns='variant').to_string(
+            index=False, float_format='%.4f'))
+        print('\nRanking (significant wins - losses):')
+        print(ranks[ranks['variant'] == variant].drop(columns='variant').to_string(index=False))
+
+    table.to_csv(out_path, index=False)
+    print(f'\nSaved pairwise tests to {out_path}')
+
+
+if __name__ == '__main__':
+    main()
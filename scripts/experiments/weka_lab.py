@@ -1,61 +1,299 @@
 """
 Main Weka Lab Experiment Script
-Runs 10-fold cross-validation on diabetes dataset with 5 classifiers and 3 data variants
+Runs 10-fold cross-validation on diabetes dataset with 5 classifiers and 3 data variants.
+With --repeats N the CV is repeated N times with different shuffles; every finished
+fold is appended to a JSONL log so an interrupted run resumes where it stopped;
+all repeats run as one grid on one process pool. --rebuild and --no-cache runs
+log under keys of their own, so they resume only themselves.
+With --export the best classifier of each variant is refit on all rows and saved,
+with its preprocessing, under results/models/ for the inference server.
+Each fold records the wall/CPU time of its fit and score calls, the peak RSS of
+the worker and how far it rose over the RSS before fit; the results CSVs carry
+them as fit_time_s, score_time_s, peak_mem_mb and peak_mem_delta_mb, and the
+fits of the run are written as a Chrome trace. Cached and
+logged folds keep the timings of the run that fit them. --profile-cell runs one
+cell under cProfile. --classifiers picks registry classifiers by name; above
+--linear-smo-rows rows SMO runs as SMO_linear (LinearSVC).
 """
 
+import argparse
+import importlib
 import os
+import sys
 import numpy as np
 import pandas as pd
-from sklearn.model_selection import cross_val_score, StratifiedKFold
-from sklearn.naive_bayes import GaussianNB
-from sklearn.tree import DecisionTreeClassifier
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.linear_model import LogisticRegression
-from sklearn.svm import SVC
-from sklearn.preprocessing import KBinsDiscretizer, MinMaxScaler
+from sklearn.model_selection import StratifiedKFold
+
+from lab_engine import LabEngine, cell_keys, profile_cell, variant_footprint, write_trace
+from result_cache import ResultCache
+from result_log import ResultLog
 
 repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
-data_path = os.path.join(repo_root, 'data', 'processed', 'diabetes.csv')
+sys.path.insert(0, os.path.join(repo_root, 'scripts', 'utils'))
+from dataset_cache import load_dataset, memory_report
+from model_export import MODELS_DIR, save_model
+
+data_path = os.path.join(repo_root, 'data', 'raw', 'diabetes.arff')
 results_path = os.path.join(repo_root, 'results', 'weka_lab_results.csv')
+folds_path = os.path.join(repo_root, 'results', 'weka_lab_folds.csv')
+log_path = os.path.join(repo_root, 'results', 'weka_lab_log.jsonl')
+cache_dir = os.path.join(repo_root, 'results', 'cache', 'weka_lab')
+trace_path = os.path.join(repo_root, 'results', 'weka_lab_trace.json')
+profile_dir = os.path.join(repo_root, 'results', 'profiles')
+
+TIMINGS = ['fit_time_s', 'fit_cpu_s', 'score_time_s', 'score_cpu_s', 'peak_mem_mb', 'peak_mem_delta_mb']
+
+
+def load_data():
+    # Typed ARFF columns via the dataset cache, narrowed to uint8/uint16/float32; the nominal
+    # class keeps its declaration order, so the codes are tested_negative=0, tested_positive=1
+    df = load_dataset(data_path, compact=True)
+    X = df.drop(columns=['class'])
+    y = pd.Series(df['class'].cat.codes.astype(np.int64), name='class')
+    return X, y
+
 
-# Load data
-df = pd.read_csv(data_path)
-# map class to 0/1
-df['class'] = df['class'].map({'tested_negative':0, 'tested_positive':1})
-X = df.drop(columns=['class'])
-y = df['class']
-
-# classifiers
-classifiers = {
-    'NaiveBayes': GaussianNB(),
-    'J48': DecisionTreeClassifier(random_state=42),
-    'RandomForest': RandomForestClassifier(random_state=42, n_estimators=100),
-    'Logistic': LogisticRegression(max_iter=1000, solver='lbfgs'),
-    'SMO': SVC(kernel='rbf', probability=True)
+# name -> (module, class, params); estimator modules are imported only when built
+CLASSIFIERS = {
+    'NaiveBayes': ('sklearn.naive_bayes', 'GaussianNB', {}),
+    'J48': ('sklearn.tree', 'DecisionTreeClassifier', {'random_state': 42}),
+    'RandomForest': ('sklearn.ensemble', 'RandomForestClassifier', {'random_state': 42, 'n_estimators': 100}),
+    'Logistic': ('sklearn.linear_model', 'LogisticRegression', {'max_iter': 1000, 'solver': 'lbfgs'}),
+    'SMO': ('sklearn.svm', 'SVC', {'kernel': 'rbf'}),
+    # Weka's default SMO (linear kernel, C=1) on liblinear: linear in the rows where SVC is quadratic
+    'SMO_linear': ('sklearn.svm', 'LinearSVC', {'C': 1.0, 'dual': 'auto'}),
 }
+# the classifiers of the lab table; build the others by name
+LAB_CLASSIFIERS = ['NaiveBayes', 'J48', 'RandomForest', 'Logistic', 'SMO']
+# above this many rows the lab runs SMO_linear in place of SMO (RBF SVC fit time grows quadratically)
+LINEAR_SMO_ROWS = 20_000
+
+# what each metric reads from a classifier: predicted labels, decision scores or class probabilities
+METRIC_OUTPUTS = {'accuracy': 'labels', 'roc_auc': 'scores', 'log_loss': 'proba'}
+# the lab scores accuracy only (lab_engine.LabEngine)
+METRICS = ['accuracy']
+
+
+def build_classifiers(names=None, outputs=None):
+    """Registry classifiers, set up for `outputs` (default: those METRICS need).
+
+    Classifiers without predict_proba get Platt scaling (an inner 5-fold CV on every
+    fit) only when 'proba' is among the outputs.
+    """
+    if outputs is None:
+        outputs = {METRIC_OUTPUTS[metric] for metric in METRICS}
+    classifiers = {}
+    for name in names or LAB_CLASSIFIERS:
+        module, cls, params = CLASSIFIERS[name]
+        est = getattr(importlib.import_module(module), cls)(**params)
+        if 'proba' in outputs and not hasattr(est, 'predict_proba'):
+            from sklearn.calibration import CalibratedClassifierCV
+
+            # what SVC(probability=True) did; that parameter is deprecated since sklearn 1.9
+            est = CalibratedClassifierCV(est, ensemble=False)
+        classifiers[name] = est
+    return classifiers
+
+
+def lab_classifier_names(names, n_rows, linear_smo_rows=LINEAR_SMO_ROWS):
+    """`names` with SMO swapped for SMO_linear when the data has more than linear_smo_rows rows."""
+    if n_rows <= linear_smo_rows or 'SMO' not in names or 'SMO_linear' in names:
+        return list(names)
+    print(f'{n_rows} rows > {linear_smo_rows}: running SMO_linear (LinearSVC) in place of the RBF SVC SMO')
+    return ['SMO_linear' if name == 'SMO' else name for name in names]
+
+
+def build_variants():
+    from sklearn.preprocessing import KBinsDiscretizer, MinMaxScaler
+
+    from mdl_discretizer import MDLDiscretizer
+
+    # Each variant is a preprocessing step fit per CV fold on the training rows only
+    return {
+        # Original
+        'original': None,
+        # Discretized - apply KBinsDiscretizer to all features (quantile bins, 5 bins)
+        'discretized': KBinsDiscretizer(n_bins=5, encode='ordinal', strategy='quantile'),
+        # Supervised Fayyad-Irani MDL bins, as Weka's supervised Discretize filter
+        'discretized_mdl': MDLDiscretizer(),
+        # Normalized - MinMaxScaler to 0-1 on first 8 attributes (all features here)
+        'normalized': MinMaxScaler(),
+    }
+
+
+def print_memory_report(X, y, variants):
+    print('Dataset columns (as parsed vs compact):')
+    print(memory_report(load_dataset(data_path)).to_string(float_format='{:.1f}'.format))
+    print('\nVariant matrices (all rows):')
+    print(pd.DataFrame(variant_footprint(X, y, variants)).to_string(index=False, float_format='{:.1f}'.format))
+    print()
+
+
+def export_best(X, y, results, variants, models_dir=MODELS_DIR):
+    """Refit the best classifier of each variant on all rows as one Pipeline and save it.
+
+    The server returns probabilities, so the classifier is rebuilt with predict_proba.
+    """
+    from sklearn.base import clone
+    from sklearn.pipeline import Pipeline
+
+    classes = load_dataset(data_path)['class'].cat.categories
+    best = pd.DataFrame(results).sort_values('accuracy_mean', ascending=False).drop_duplicates('variant')
+    paths = []
+    for row in best.itertuples():
+        step = variants[row.variant]
+        model = Pipeline([('preprocess', 'passthrough' if step is None else clone(step)),
+                          ('clf', build_classifiers([row.classifier], outputs={'proba'})[row.classifier])]).fit(X, y)
+        paths.append(save_model(f'diabetes_{row.variant}', model, X, classes, models_dir=models_dir,
+                                meta={'dataset': 'diabetes', 'variant': row.variant, 'classifier': row.classifier,
+                                      'cv_accuracy': row.accuracy_mean}))
+    return paths
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Weka lab replication with 10-fold CV')
+    parser.add_argument('--classifiers', nargs='+', choices=list(CLASSIFIERS), default=LAB_CLASSIFIERS,
+                        help='registry classifiers to run (SMO_linear: LinearSVC, Weka\'s default linear SMO)')
+    parser.add_argument('--linear-smo-rows', type=int, default=LINEAR_SMO_ROWS,
+                        help='run SMO_linear instead of SMO above this many rows')
+    parser.add_argument('--no-cache', action='store_true', help='do not read or write the fold result cache')
+    parser.add_argument('--rebuild', action='store_true', help='refit every cell and overwrite cached results')
+    parser.add_argument('--cache-dir', default=cache_dir)
+    parser.add_argument('--cache-size-mb', type=float, default=512, help='LRU size bound of the cache')
+    parser.add_argument('--store-models', action='store_true', help='also cache the fitted fold models')
+    parser.add_argument('--repeats', type=int, default=1,
+                        help='repetitions of 10-fold CV, each with its own shuffle (Weka Experimenter uses 10)')
+    parser.add_argument('--log', default=log_path, help='append-only JSONL log of finished folds, used to resume')
+    parser.add_argument('--fresh-log', action='store_true', help='discard the existing log instead of resuming')
+    parser.add_argument('--memory-report', action='store_true', help='print per-column and per-variant memory use')
+    parser.add_argument('--export', action='store_true', help='save the best model of each variant for serving')
+    parser.add_argument('--models-dir', default=MODELS_DIR)
+    parser.add_argument('--trace', default=trace_path, help='Chrome trace of the fits run (chrome://tracing, Perfetto)')
+    parser.add_argument('--profile-cell', metavar='VARIANT:CLASSIFIER[:FOLD]',
+                        help='only profile one cell with cProfile and print its top functions')
+    return parser.parse_args(argv)
+
+
+def run_profile(X, y, variants, classifiers, spec, top=25):
+    import pstats
+
+    variant, classifier, fold = (spec.split(':') + ['0'])[:3]
+    if variant not in variants or classifier not in classifiers:
+        sys.exit(f'unknown cell {spec}; variants: {list(variants)}, classifiers: {list(classifiers)}')
+    cv = StratifiedKFold(n_splits=10, shuffle=True, random_state=42)
+    path = os.path.join(profile_dir, f'{variant}_{classifier}_fold{fold}.prof')
+    res = profile_cell(X, y, variants, classifiers, cv, variant, classifier, int(fold), path)
+    print(f'{variant} {classifier} fold {fold}: accuracy {res["accuracy"]:.4f}, fit {res["fit_time_s"]:.3f}s, '
+          f'score {res["score_time_s"]:.3f}s, peak {res["peak_mem_mb"]:.0f} MB '
+          f'(+{res["peak_mem_delta_mb"]:.1f} MB)')
+    pstats.Stats(path).sort_stats('cumulative').print_stats(top)
+    print('Saved profile to', path, '(view with snakeviz or python -m pstats)')
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    X, y = load_data()
+    classifiers = build_classifiers(lab_classifier_names(args.classifiers, len(X), args.linear_smo_rows))
+    variants = build_variants()
+    if args.memory_report:
+        print_memory_report(X, y, variants)
+    if args.profile_cell:
+        run_profile(X, y, variants, classifiers, args.profile_cell)
+        return
+
+    cache = None
+    if not args.no_cache:
+        cache = ResultCache(args.cache_dir, max_bytes=int(args.cache_size_mb * 2**20), rebuild=args.rebuild)
+    log = ResultLog(args.log, fresh=args.fresh_log)
+    # --rebuild / --no-cache runs log under their own keys: they resume their own interrupted
+    # runs, but do not reuse folds that a normal run served from the cache or the log
+    mode = 'rebuild' if args.rebuild else 'no-cache' if args.no_cache else None
+
+    def log_key(cell_key):
+        return cell_key if mode is None else ResultCache.key('weka-lab-log', mode, cell_key)
+
+    if log.records:
+        print(f'Log {args.log}: {len(log.records)} fold results')
+
+    # fold_scores[(variant, classifier)][(repeat, fold)] = accuracy and timings; printed as each cell's repeat completes
+    fold_scores = {}
+    n_folds = 10
+    trace = []
+    width = max(map(len, variants)), max(map(len, classifiers))
+
+    def record(repeat, res):
+        cell = (res['variant'], res['classifier'])
+        scores = fold_scores.setdefault(cell, {})
+        # results cached or logged before timings were recorded have none
+        scores[(repeat, res['fold'])] = {'accuracy': res['accuracy'],
+                                         **{name: res.get(name, np.nan) for name in TIMINGS}}
+        if sum(r == repeat for r, _ in scores) == n_folds:
+            acc = np.array([s['accuracy'] for s in scores.values()])
+            prefix = f'[repeat {repeat + 1}/{args.repeats}] ' if args.repeats > 1 else ''
+            print(f'{prefix}{cell[0]:<{width[0]}} {cell[1]:<{width[1]}} '
+                  f'Accuracy: {acc.mean():.4f} (+/- {acc.std():.4f})')
+
+    # CV setup - each repeat's folds are computed once and shared by every cell
+    cvs = [StratifiedKFold(n_splits=n_folds, shuffle=True, random_state=42 + repeat) for repeat in range(args.repeats)]
+    keys = {(repeat,) + cell: log_key(key) for repeat, cv in enumerate(cvs)
+            for cell, key in cell_keys(X, y, variants, classifiers, cv).items()}
+    logged = {task for task, key in keys.items() if log.get(key) is not None}
+    if logged:
+        print(f'Resuming: {len(logged)} of {len(keys)} folds already logged for this run')
+    for task in logged:
+        record(task[0], {**log.get(keys[task]), 'variant': task[1], 'classifier': task[2], 'fold': task[3]})
+
+    try:
+        # All remaining fits of every repeat go to one process pool; each result is logged as it arrives
+        with LabEngine(X, y, variants, classifiers, cvs, n_jobs=-1) as engine:
+            for res in engine.run(cache=cache, store_models=args.store_models, skip=logged):
+                repeat = res['repeat']
+                log.append({'key': keys[(repeat, res['variant'], res['classifier'], res['fold'])],
+                            'repeat': repeat, 'seed': cvs[repeat].random_state, 'variant': res['variant'],
+                            'classifier': res['classifier'], 'fold': res['fold'], 'accuracy': res['accuracy'],
+                            **{name: res[name] for name in TIMINGS if name in res}})
+                record(repeat, res)
+                trace.extend(res.get('trace', []))
+    finally:
+        log.close()
+
+    results = []
+    folds = []
+    for variant_name in variants:
+        for clf_name in classifiers:
+            by_fold = fold_scores[(variant_name, clf_name)]
+            cell = pd.DataFrame([by_fold[(r, f)] for r in range(args.repeats) for f in range(n_folds)])
+            results.append({'variant': variant_name, 'classifier': clf_name,
+                            'accuracy_mean': cell['accuracy'].mean(), 'accuracy_std': cell['accuracy'].std(ddof=0),
+                            'fit_time_s': cell['fit_time_s'].mean(), 'score_time_s': cell['score_time_s'].mean(),
+                            'peak_mem_mb': cell['peak_mem_mb'].max(),
+                            'peak_mem_delta_mb': cell['peak_mem_delta_mb'].max()})
+            folds.extend({'variant': variant_name, 'classifier': clf_name, 'repeat': r, 'fold': f,
+                          **by_fold[(r, f)]} for r in range(args.repeats) for f in range(n_folds))
+
+    if cache is not None:
+        print(f'\nCache: {cache.hits} fold results reused, {cache.misses} fitted')
+
+    # Save results
+    os.makedirs(os.path.dirname(results_path), exist_ok=True)
+    pd.DataFrame(results).to_csv(results_path, index=False)
+    # per-fold scores, for the significance tests in comparison.py
+    pd.DataFrame(folds).to_csv(folds_path, index=False)
+    print('\nSaved results to', results_path)
+    print('Saved per-fold scores to', folds_path)
+
+    timings = pd.DataFrame(results).groupby('classifier').agg(
+        {'fit_time_s': 'mean', 'score_time_s': 'mean', 'peak_mem_mb': 'max', 'peak_mem_delta_mb': 'max'})
+    print('\nPer-fold fit/score seconds, peak worker RSS and its growth during a fold (MB), by classifier:')
+    print(timings.to_string(float_format='{:.4f}'.format))
+    if trace:
+        write_trace(trace, args.trace)
+        print(f'Saved a trace of {len(trace)} spans to {args.trace}')
+
+    if args.export:
+        for path in export_best(X, y, results, variants, args.models_dir):
+            print('Exported', path)
+
 
-# CV setup
-cv = StratifiedKFold(n_splits=10, shuffle=True, random_state=42)
-
-variants = {}
-# Original
-variants['original'] = X.copy()
-# Discretized - apply KBinsDiscretizer to all features (uniform bins, 5 bins)
-kbd = KBinsDiscretizer(n_bins=5, encode='ordinal', strategy='quantile')
-variants['discretized'] = pd.DataFrame(kbd.fit_transform(X), columns=X.columns)
-# Normalized - MinMaxScaler to 0-1 on first 8 attributes (all features here)
-scaler = MinMaxScaler()
-variants['normalized'] = pd.DataFrame(scaler.fit_transform(X), columns=X.columns)
-
-results = []
-for variant_name, Xv in variants.items():
-    for clf_name, clf in classifiers.items():
-        scores = cross_val_score(clf, Xv, y, cv=cv, scoring='accuracy', n_jobs=-1)
-        mean_acc = scores.mean()
-        std_acc = scores.std()
-        results.append({'variant': variant_name, 'classifier': clf_name, 'accuracy_mean': mean_acc, 'accuracy_std': std_acc})
-        print(f'{variant_name:<12} {clf_name:<12} Accuracy: {mean_acc:.4f} (+/- {std_acc:.4f})')
-
-# Save results
-pd.DataFrame(results).to_csv(results_path, index=False)
-print('\nSaved results to', results_path)
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,201 @@
+"""
+Streaming ARFF Reader
+Parses a Weka ARFF file into typed NumPy record batches without a CSV round trip.
+Numeric attributes become float64 columns and nominal attributes become integer
+codes in declaration order (-1 for missing); string/date attributes stay as
+Python strings. Both dense rows and sparse `{index value, ...}` rows are read,
+and at most `batch_size` rows are held in memory at a time.
+"""
+
+import csv
+from collections import namedtuple
+
+import numpy as np
+
+ArffAttribute = namedtuple('ArffAttribute', ['name', 'kind', 'values'])
+
+NUMERIC_TYPES = ('numeric', 'real', 'integer')
+
+
+def _split_values(text, delimiter=','):
+    """Split a comma-separated ARFF value list, honouring ' and " quoting."""
+    if "'" not in text and '"' not in text:
+        return [v.strip() for v in text.split(delimiter)]
+    quote = "'" if "'" in text else '"'
+    row = next(csv.reader([text], delimiter=delimiter, quotechar=quote, skipinitialspace=True))
+    return [v.strip() for v in row]
+
+
+def _parse_attribute(line):
+    rest = line[len('@attribute'):].strip()
+    if rest[:1] in ("'", '"'):
+        end = rest.find(rest[0], 1)
+        name, type_text = (rest[1:end], rest[end + 1:].strip()) if end > 0 else ('', '')
+    else:
+        name, type_text = (rest.split(None, 1) + ['', ''])[:2]
+        if '{' in name:
+            name, brace, tail = name.partition('{')
+            type_text = brace + tail + ' ' + type_text
+        name, type_text = name.strip(), type_text.strip()
+    if not name or not type_text or (type_text.startswith('{') and '}' not in type_text):
+        raise ValueError(f'malformed attribute declaration: {line!r}')
+    if type_text.startswith('{'):
+        values = _split_values(type_text[1:type_text.rindex('}')])
+        return ArffAttribute(name, 'nominal', [v.strip("'\"") for v in values])
+    kind = type_text.split()[0].lower()
+    return ArffAttribute(name, 'numeric' if kind in NUMERIC_TYPES else 'string', None)
+
+
+def read_header(f):
+    """Consume the header from an open file; returns (relation, attributes)."""
+    relation, attributes = None, []
+    for lineno, raw in enumerate(f, 1):
+        line = raw.strip()
+        if not line or line.startswith('%'):
+            continue
+        low = line.lower()
+        if low.startswith('@relation'):
+            parts = line.split(None, 1)
+            relation = parts[1].strip("'\"") if len(parts) > 1 else ''
+        elif low.startswith('@attribute'):
+            try:
+                attributes.append(_parse_attribute(line))
+            except ValueError as exc:
+                raise ValueError(f'line {lineno}: {exc}') from None
+        elif low.startswith('@data'):
+            return relation, attributes
+    raise ValueError('no @data section found')
+
+
+def record_dtype(attributes):
+    fields = []
+    for attr in attributes:
+        if attr.kind == 'numeric':
+            fields.append((attr.name, np.float64))
+        elif attr.kind == 'nominal':
+            fields.append((attr.name, np.int16 if len(attr.values) < 2**15 else np.int32))
+        else:
+            fields.append((attr.name, object))
+    return np.dtype(fields)
+
+
+def _fill_column(out, attr, tokens):
+    tokens = np.asarray(tokens, dtype=object)
+    if attr.kind == 'string':
+        out[attr.name] = [None if t == '?' else t.strip("'\"") for t in tokens]
+        return
+    missing = tokens == '?'
+    if attr.kind == 'numeric':
+        col = np.full(len(tokens), np.nan)
+        col[~missing] = tokens[~missing].astype(np.float64)
+        out[attr.name] = col
+        return
+    lookup = {v: i for i, v in enumerate(attr.values)}
+    uniq, inverse = np.unique(tokens.astype(str), return_inverse=True)
+    codes = np.array([-1 if u == '?' else lookup[u.strip("'\"")] for u in uniq])
+    out[attr.name] = codes[inverse]
+
+
+def _dense_batch(lines, attributes, dtype):
+    n = len(lines)
+    if any("'" in line or '"' in line for line in lines):
+        rows = [_split_values(line) for line in lines]
+    else:
+        rows = [line.split(',') for line in lines]
+    if any(len(r) != len(attributes) for r in rows):
+        raise ValueError(f'expected {len(attributes)} values per row')
+    grid = np.char.strip(np.array(rows, dtype=str))
+    out = np.empty(n, dtype=dtype)
+    for j, attr in enumerate(attributes):
+        _fill_column(out, attr, grid[:, j])
+    return out
+
+
+def _sparse_batch(lines, attributes, dtype):
+    # sparse rows only list non-zero entries; absent numeric -> 0, absent nominal -> first value
+    out = np.zeros(len(lines), dtype=dtype)
+    for attr in attributes:
+        if attr.kind == 'string':
+            out[attr.name] = ''
+    by_col = {}
+    for i, line in enumerate(lines):
+        body = line.strip()[1:-1].strip()
+        if not body:
+            continue
+        for item in _split_values(body):
+            idx, value = item.split(None, 1)
+            rows, vals = by_col.setdefault(int(idx), ([], []))
+            rows.append(i)
+            vals.append(value.strip())
+    for j, (rows, vals) in by_col.items():
+        attr = attributes[j]
+        holder = np.empty(len(rows), dtype=[(attr.name, dtype[attr.name])])
+        _fill_column(holder, attr, vals)
+        out[attr.name][rows] = holder[attr.name]
+    return out
+
+
+def _to_batch(lines, attributes, dtype):
+    dense = [line for line in lines if not line.startswith('{')]
+    if len(dense) == len(lines):
+        return _dense_batch(lines, attributes, dtype)
+    if not dense:
+        return _sparse_batch(lines, attributes, dtype)
+    # mixed dense/sparse rows: parse row by row to keep order
+    return np.concatenate([_to_batch([line], attributes, dtype) for line in lines])
+
+
+def iter_batches(path, batch_size=65536):
+    """
+    Yield (attributes, batch) for consecutive runs of up to `batch_size` data
+    rows, where batch is a NumPy record array with one field per attribute.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        _, attributes = read_header(f)
+        dtype = record_dtype(attributes)
+        lines = []
+        for raw in f:
+            line = raw.strip()
+            if not line or line.startswith('%'):
+                continue
+            lines.append(line)
+            if len(lines) == batch_size:
+                yield attributes, _to_batch(lines, attributes, dtype)
+                lines = []
+        if lines:
+            yield attributes, _to_batch(lines, attributes, dtype)
+
+
+def load_arff(path, batch_size=65536):
+    """Read the whole file; returns (records, attributes)."""
+    with open(path, 'r', encoding='utf-8') as f:
+        _, attributes = read_header(f)
+    batches = [batch for _, batch in iter_batches(path, batch_size)]
+    if not batches:
+        return np.empty(0, dtype=record_dtype(attributes)), attributes
+    return np.concatenate(batches), attributes
+
+
+def load_xy(path, target=None, batch_size=65536):
+    """
+    Feature matrix (float64, nominal features as codes), target codes and
+    feature names. The target defaults to the last attribute.
+    """
+    records, attributes = load_arff(path, batch_size)
+    target = target or attributes[-1].name
+    names = [a.name for a in attributes if a.name != target]
+    X = np.column_stack([records[n].astype(np.float64) for n in names])
+    return X, records[target], names
+
+
+def to_frame(batch, attributes):
+    """Record batch -> DataFrame with nominal columns as pandas categoricals."""
+    import pandas as pd
+
+    cols = {}
+    for attr in attributes:
+        if attr.kind == 'nominal':
+            cols[attr.name] = pd.Categorical.from_codes(batch[attr.name], attr.values)
+        else:
+            cols[attr.name] = batch[attr.name]
+    return pd.DataFrame(cols)
@@ -1,6 +1,7 @@
-import csv
 import os
 
+from arff_reader import iter_batches, to_frame
+
 def main():
     repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
     in_path = os.path.join(repo_root, 'data', 'raw', 'diabetes.arff')
@@ -8,32 +9,14 @@ def main():
     
     os.makedirs(os.path.dirname(out_path), exist_ok=True)
     
-    with open(in_path, 'r', encoding='utf-8') as fin, open(out_path, 'w', newline='', encoding='utf-8') as fout:
-        headers = []
-        data_started = False
-        writer = None
-        for raw in fin:
-            line = raw.strip()
-            if not line or line.startswith('%'):
-                continue
-            low = line.lower()
-            if low.startswith('@attribute'):
-                # attribute format: @attribute 'name' type  or @attribute name type
-                parts = line.split()
-                if len(parts) >= 2:
-                    attr = parts[1].strip("'\"")
-                    headers.append(attr)
-            elif low.startswith('@data'):
-                data_started = True
-                # write header before data
-                writer = csv.writer(fout)
-                writer.writerow(headers)
-            else:
-                if not data_started:
-                    # ignore any non-attribute lines before @data
-                    continue
-                vals = [v.strip() for v in line.split(',')]
-                writer.writerow(vals)
+    # Typed streaming read; each batch is written as soon as it is parsed, so memory
+    # stays bounded by the batch size however large the ARFF export is
+    with open(out_path, 'w', newline='', encoding='utf-8') as fout:
+        first = True
+        for attributes, batch in iter_batches(in_path):
+            frame = to_frame(batch, attributes)
+            frame.to_csv(fout, header=first, index=False, float_format='%.15g', na_rep='?')
+            first = False
 
     print('Wrote CSV to', out_path)
 
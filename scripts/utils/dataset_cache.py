@@ -0,0 +1,206 @@
+"""
+Columnar Dataset Cache
+Parses each raw dataset once and keeps a typed binary copy under data/cache/:
+one .npy file per column plus a meta.json describing dtypes and categories.
+Later loads memory-map the .npy files instead of re-parsing text. A copy is
+valid while the source's mtime/size match; if they changed, the content hash
+decides whether to rebuild.
+
+All scripts should load data through load_dataset() so that missing-value and
+type handling is the same everywhere. With compact=True numeric columns come
+back in the narrowest dtype that holds them (see narrow_dtype); categorical
+codes are always stored in the narrowest signed integer type.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+CACHE_ROOT = os.path.join(repo_root, 'data', 'cache')
+FORMAT_VERSION = 3
+NA_VALUES = ['?']
+
+
+def file_digest(path, chunk_size=1 << 20):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _read_arff(path):
+    from arff_reader import load_arff, to_frame
+
+    records, attributes = load_arff(path)
+    return to_frame(records, attributes)
+
+
+def _read_tab(path):
+    from tab_reader import read_tab
+
+    return read_tab(path)
+
+
+def parse_source(path):
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.arff':
+        return _read_arff(path)
+    if ext == '.tab':
+        return _read_tab(path)
+    if ext == '.csv':
+        return pd.read_csv(path, na_values=NA_VALUES)
+    raise ValueError(f'unsupported dataset format: {path}')
+
+
+def narrow_dtype(values, float_dtype=np.float32):
+    """
+    Narrowest dtype for a numeric array: the smallest unsigned/signed integer
+    type that holds every value exactly if all values are whole numbers (no
+    NaN), else float_dtype (float32 is what the lab fits on anyway).
+    """
+    values = np.asarray(values)
+    if values.dtype.kind in 'biu' or (values.dtype.kind == 'f' and np.isfinite(values).all()
+                                      and (values == np.round(values)).all()):
+        if values.size == 0:
+            return np.dtype(np.uint8)
+        lo, hi = values.min(), values.max()
+        for dtype in (np.uint8, np.uint16, np.uint32) if lo >= 0 else (np.int8, np.int16, np.int32):
+            info = np.iinfo(dtype)
+            if info.min <= lo and hi <= info.max:
+                return np.dtype(dtype)
+        return values.dtype if values.dtype.kind in 'iu' else np.dtype(np.int64)
+    if values.dtype.kind == 'f' and values.dtype.itemsize < np.dtype(float_dtype).itemsize:
+        return values.dtype
+    return np.dtype(float_dtype)
+
+
+def compact_arrays(*arrays, float_dtype=np.float32):
+    """Cast arrays that belong together (e.g. a fold's train and test rows) to one common narrow dtype."""
+    dtype = np.result_type(*(narrow_dtype(a, float_dtype) for a in arrays))
+    return tuple(np.asarray(a, dtype=dtype) for a in arrays)
+
+
+def compact_frame(df, float_dtype=np.float32):
+    """Copy of df with every numeric column in its narrow_dtype; other columns are untouched."""
+    return df.astype({col: narrow_dtype(df[col].to_numpy(), float_dtype)
+                      for col in df.columns if pd.api.types.is_numeric_dtype(df[col].dtype)
+                      and not isinstance(df[col].dtype, pd.CategoricalDtype)})
+
+
+def memory_report(df, float_dtype=np.float32):
+    """Per-column dtype and bytes as loaded vs compacted, plus a total row."""
+    compact = compact_frame(df, float_dtype)
+    report = pd.DataFrame({'dtype': df.dtypes.astype(str), 'bytes': df.memory_usage(index=False, deep=True),
+                           'compact_dtype': compact.dtypes.astype(str),
+                           'compact_bytes': compact.memory_usage(index=False, deep=True)})
+    report.loc['total'] = ['', report['bytes'].sum(), '', report['compact_bytes'].sum()]
+    report['ratio'] = report['bytes'] / report['compact_bytes']
+    return report
+
+
+def cache_dir_for(path, cache_root=CACHE_ROOT):
+    stem = os.path.splitext(os.path.basename(path))[0]
+    tag = hashlib.sha1(os.path.abspath(path).encode()).hexdigest()[:10]
+    return os.path.join(cache_root, f'{stem}-{tag}')
+
+
+def write_columns(df, out_dir, meta):
+    """Store each column as .npy; text/categorical columns as int32 codes + categories."""
+    tmp_dir = out_dir + '.tmp'
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    columns = []
+    for i, name in enumerate(df.columns):
+        col = df[name]
+        entry = {'name': str(name), 'file': f'{i:04d}.npy'}
+        if isinstance(col.dtype, pd.CategoricalDtype) or col.dtype == object or pd.api.types.is_string_dtype(col):
+            cat = col.astype('category')
+            # keep numeric category labels (e.g. Orange discrete cylinders 3..8) numeric
+            entry['categories'] = cat.cat.categories.tolist()
+            codes = cat.cat.codes.to_numpy()
+            # signed: -1 marks a missing value
+            values = codes.astype(narrow_dtype(np.append(codes, -1)))
+        else:
+            values = col.to_numpy()
+        np.save(os.path.join(tmp_dir, entry['file']), values)
+        columns.append(entry)
+    meta = dict(meta, columns=columns, n_rows=len(df),
+                roles=df.attrs.get('roles', {}), target=df.attrs.get('target'))
+    with open(os.path.join(tmp_dir, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=1)
+    shutil.rmtree(out_dir, ignore_errors=True)
+    os.replace(tmp_dir, out_dir)
+
+
+def read_columns(cache_dir, meta, mmap=True):
+    """Column name -> array (memory-mapped) or pandas Categorical for coded columns."""
+    cols = {}
+    for entry in meta['columns']:
+        values = np.load(os.path.join(cache_dir, entry['file']), mmap_mode='r' if mmap else None)
+        if 'categories' in entry:
+            values = pd.Categorical.from_codes(np.asarray(values), entry['categories'])
+        cols[entry['name']] = values
+    return cols
+
+
+def _load_meta(cache_dir):
+    try:
+        with open(os.path.join(cache_dir, 'meta.json'), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def ensure_cached(path, cache_root=CACHE_ROOT, parser=None):
+    """Build the columnar copy if it is missing or stale; returns (cache_dir, meta)."""
+    path = os.path.abspath(path)
+    st = os.stat(path)
+    out_dir = cache_dir_for(path, cache_root)
+    meta = _load_meta(out_dir)
+    if meta is not None and meta.get('version') == FORMAT_VERSION:
+        if meta['mtime_ns'] == st.st_mtime_ns and meta['size'] == st.st_size:
+            return out_dir, meta
+        digest = file_digest(path)
+        if meta['sha256'] == digest:
+            # touched but unchanged content: refresh the stamp only
+            meta.update(mtime_ns=st.st_mtime_ns, size=st.st_size)
+            with open(os.path.join(out_dir, 'meta.json'), 'w', encoding='utf-8') as f:
+                json.dump(meta, f, indent=1)
+            return out_dir, meta
+    else:
+        digest = file_digest(path)
+
+    df = (parser or parse_source)(path)
+    meta = {'version': FORMAT_VERSION, 'source': path, 'mtime_ns': st.st_mtime_ns,
+            'size': st.st_size, 'sha256': digest}
+    write_columns(df, out_dir, meta)
+    return out_dir, _load_meta(out_dir)
+
+
+def load_dataset(path, columns=None, mmap=True, cache_root=CACHE_ROOT, parser=None, compact=False):
+    """
+    Load a .csv/.tab/.arff dataset as a DataFrame through the columnar cache.
+    Numeric columns are backed by memory-mapped .npy files when mmap=True;
+    compact=True narrows them instead (whole-number columns to the smallest
+    integer type, the rest to float32).
+    """
+    cache_dir, meta = ensure_cached(path, cache_root, parser)
+    if columns is not None:
+        wanted = set(columns)
+        meta = dict(meta, columns=[c for c in meta['columns'] if c['name'] in wanted])
+    cols = read_columns(cache_dir, meta, mmap=mmap)
+    df = pd.DataFrame(cols, copy=False)
+    # column roles from the source header (Orange .tab class/meta rows), if any
+    df.attrs['roles'] = meta.get('roles', {})
+    df.attrs['target'] = meta.get('target')
+    if compact:
+        attrs = df.attrs
+        df = compact_frame(df)
+        df.attrs = attrs
+    return df
@@ -0,0 +1,279 @@
+"""
+Micro-Batching Inference Server
+Serves the model bundles written by model_export.save_model over HTTP on
+localhost (asyncio, standard library only). Concurrent requests for the same
+model are queued and coalesced: a batch is closed once it holds --max-batch
+rows or its first request has waited --max-wait-ms, and is then scored with a
+single predict_proba call in a worker thread, so the event loop keeps taking
+requests while the model runs. Requests that arrive during a predict_proba
+call form the next batch.
+
+    POST /predict/<model>  {"rows": [{feature: value, ...}, ...]} or {"row": {...}}
+                           -> {"classes": [...], "proba": [[...], ...]}
+    GET  /models           -> features, example row and metadata of every model
+    GET  /stats            -> requests, rows and batches per model
+
+--bench N starts the server in-process and sends N single-row requests from
+--concurrency keep-alive clients, then prints latency percentiles.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from model_export import MODELS_DIR, list_models, load_model, to_frame
+
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           500: 'Internal Server Error'}
+
+
+class MicroBatcher:
+    """Queue of pending requests for one model, scored in batches by run()."""
+
+    def __init__(self, bundle, max_batch, max_wait, executor):
+        self.bundle = bundle
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.executor = executor
+        self.queue = asyncio.Queue()
+        self.requests = self.rows = self.batches = 0
+
+    async def predict(self, rows):
+        missing = {f for row in rows for f in self.bundle['features'] if f not in row}
+        if missing:
+            raise ValueError(f'missing features: {sorted(missing)}')
+        future = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait((rows, future))
+        return await future
+
+    async def _next_batch(self):
+        loop = asyncio.get_running_loop()
+        batch = [await self.queue.get()]
+        n_rows = len(batch[0][0])
+        deadline = loop.time() + self.max_wait
+        while n_rows < self.max_batch:
+            if self.queue.empty():
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+            else:
+                item = self.queue.get_nowait()
+            batch.append(item)
+            n_rows += len(item[0])
+        return batch
+
+    def _predict(self, rows):
+        return self.bundle['model'].predict_proba(to_frame(self.bundle, rows))
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._next_batch()
+            rows = [row for request, _ in batch for row in request]
+            try:
+                proba = await loop.run_in_executor(self.executor, self._predict, rows)
+                results = np.split(proba, np.cumsum([len(request) for request, _ in batch])[:-1])
+            except Exception:
+                # a bad row must not fail the rest of the batch: score its requests one by one
+                results = []
+                for request, _ in batch:
+                    try:
+                        results.append(await loop.run_in_executor(self.executor, self._predict, request))
+                    except Exception as exc:
+                        results.append(exc)
+            for (request, future), result in zip(batch, results):
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+            self.requests += len(batch)
+            self.rows += len(rows)
+            self.batches += 1
+
+    def stats(self):
+        return {'requests': self.requests, 'rows': self.rows, 'batches': self.batches,
+                'mean_batch_rows': self.rows / self.batches if self.batches else 0.0}
+
+
+class InferenceServer:
+    def __init__(self, bundles, max_batch=64, max_wait=0.002):
+        self.executor = ThreadPoolExecutor(max_workers=max(1, len(bundles)))
+        self.batchers = {b['name']: MicroBatcher(b, max_batch, max_wait, self.executor) for b in bundles}
+        self.tasks = []
+        self.server = None
+
+    async def start(self, host='127.0.0.1', port=8000):
+        self.tasks = [asyncio.create_task(b.run()) for b in self.batchers.values()]
+        self.server = await asyncio.start_server(self.handle, host, port)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.executor.shutdown()
+
+    async def dispatch(self, method, target, body):
+        path = target.split('?', 1)[0].rstrip('/')
+        if path == '/models':
+            return 200, {name: {key: b.bundle[key] for key in ('features', 'classes', 'example', 'meta')}
+                         for name, b in self.batchers.items()}
+        if path == '/stats':
+            return 200, {name: b.stats() for name, b in self.batchers.items()}
+        if not path.startswith('/predict/'):
+            return 404, {'error': f'unknown path {path}'}
+        batcher = self.batchers.get(path[len('/predict/'):])
+        if batcher is None:
+            return 404, {'error': f'unknown model, available: {sorted(self.batchers)}'}
+        if method != 'POST':
+            return 405, {'error': 'use POST'}
+        try:
+            payload = json.loads(body)
+            rows = payload['rows'] if 'rows' in payload else [payload['row']]
+            if not rows or not all(isinstance(row, dict) for row in rows):
+                raise ValueError('rows must be a non-empty list of objects')
+            proba = await batcher.predict(rows)
+        except (ValueError, KeyError, TypeError) as exc:
+            return 400, {'error': str(exc)}
+        except Exception as exc:
+            return 500, {'error': f'{type(exc).__name__}: {exc}'}
+        return 200, {'classes': batcher.bundle['classes'], 'proba': proba.tolist()}
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                method, target, _ = line.decode('latin-1').split(' ', 2)
+                headers = {}
+                while True:
+                    header = await reader.readline()
+                    if header in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = header.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get('content-length', 0)))
+                status, payload = await self.dispatch(method, target, body)
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                data = json.dumps(payload).encode()
+                head = (f'HTTP/1.1 {status} {REASONS[status]}\r\nContent-Type: application/json\r\n'
+                        f'Content-Length: {len(data)}\r\n' + ('' if keep_alive else 'Connection: close\r\n'))
+                writer.write(head.encode() + b'\r\n' + data)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+
+async def _client(host, port, model, row, n, latencies):
+    reader, writer = await asyncio.open_connection(host, port)
+    body = json.dumps({'row': row}).encode()
+    request = (f'POST /predict/{model} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n'
+               f'Content-Length: {len(body)}\r\n\r\n').encode() + body
+    for _ in range(n):
+        start = time.perf_counter()
+        writer.write(request)
+        await writer.drain()
+        status = await reader.readline()
+        length = 0
+        while True:
+            header = await reader.readline()
+            if header == b'\r\n':
+                break
+            if header.lower().startswith(b'content-length:'):
+                length = int(header.split(b':')[1])
+        await reader.readexactly(length)
+        if b' 200 ' not in status:
+            raise RuntimeError(f'request failed: {status.decode().strip()}')
+        latencies.append(time.perf_counter() - start)
+    writer.close()
+
+
+async def bench(server, model, n_requests, concurrency, host='127.0.0.1'):
+    port = await server.start(host, 0)
+    row = server.batchers[model].bundle['example']
+    latencies = []
+    start = time.perf_counter()
+    per_client = [n_requests // concurrency + (i < n_requests % concurrency) for i in range(concurrency)]
+    await asyncio.gather(*(_client(host, port, model, row, n, latencies) for n in per_client if n))
+    elapsed = time.perf_counter() - start
+    stats = server.batchers[model].stats()
+    await server.stop()
+    ms = np.array(latencies) * 1000
+    print(f'{model}: {len(ms)} requests from {concurrency} clients in {elapsed:.2f}s '
+          f'({len(ms) / elapsed:.0f} req/s), {stats["batches"]} batches, '
+          f'mean batch {stats["mean_batch_rows"]:.1f} rows')
+    print('latency ms: ' + '  '.join(f'p{q}={np.percentile(ms, q):.2f}' for q in (50, 95, 99)) +
+          f'  max={ms.max():.2f}')
+
+
+async def serve(server, host, port):
+    port = await server.start(host, port)
+    print(f'Serving {sorted(server.batchers)} on http://{host}:{port}')
+    try:
+        await server.server.serve_forever()
+    finally:
+        await server.stop()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Micro-batching HTTP inference server for exported models')
+    parser.add_argument('--models', nargs='+', help='model bundles (default: every .joblib in --models-dir)')
+    parser.add_argument('--models-dir', default=MODELS_DIR)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--max-batch', type=int, default=64, help='rows per predict_proba call')
+    parser.add_argument('--max-wait-ms', type=float, default=2.0,
+                        help='longest time the first request of a batch waits for others')
+    parser.add_argument('--bench', type=int, metavar='N', help='send N requests in-process and report latency')
+    parser.add_argument('--concurrency', type=int, default=32, help='concurrent clients for --bench')
+    parser.add_argument('--bench-model', help='model for --bench (default: the first one)')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    paths = args.models or list_models(args.models_dir)
+    if not paths:
+        sys.exit(f'No models in {args.models_dir}; export some with weka_lab.py --export '
+                 'or ilpd_pipeline.py --export')
+    bundles = []
+    for path in paths:
+        try:
+            bundles.append(load_model(path))
+        except Exception as exc:
+            print(f'Skipping {path}: {type(exc).__name__}: {exc}')
+    if not bundles:
+        sys.exit('No loadable models')
+    server = InferenceServer(bundles, max_batch=args.max_batch, max_wait=args.max_wait_ms / 1000)
+    try:
+        if args.bench:
+            asyncio.run(bench(server, args.bench_model or bundles[0]['name'], args.bench, args.concurrency,
+                              args.host))
+        else:
+            asyncio.run(serve(server, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
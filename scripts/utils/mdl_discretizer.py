@@ -0,0 +1,97 @@
+"""
+Supervised MDL Discretization
+Fayyad & Irani's entropy/MDL discretization as done by Weka's
+weka.filters.supervised.attribute.Discretize (default options): each feature
+is split recursively at the boundary between distinct values that minimizes
+the class entropy of the two halves, and a split is kept only if its
+information gain passes the MDL criterion. Cut points are midpoints between
+neighbouring values, a value equal to a cut point goes to the lower bin, and
+missing values stay missing.
+
+Each feature is sorted once and turned into cumulative class counts at the
+boundaries between distinct values, so the entropy of every candidate cut of
+a segment is a few array operations on count differences; Python only loops
+over accepted cuts.
+
+Lives in scripts/utils so pickled lab pipelines that contain it load in the
+inference server; scripts/experiments/discretizer_benchmark.py benchmarks it.
+"""
+
+import numpy as np
+from sklearn.base import BaseEstimator, TransformerMixin
+
+
+def _xlog2x(x):
+    return x * np.log2(np.maximum(x, 1))
+
+
+def _entropy(counts):
+    n = counts.sum()
+    return (_xlog2x(n) - _xlog2x(counts).sum()) / n if n > 0 else 0.0
+
+
+def _mdl_accepts(total, left, right, n, n_candidates, split_entropy):
+    """Weka's FayyadAndIranisMDL test for the best cut of a segment."""
+    prior = _entropy(total)
+    k, k_left, k_right = (total > 0).sum(), (left > 0).sum(), (right > 0).sum()
+    delta = np.log2(3.0 ** k - 2) - (k * prior - k_right * _entropy(right) - k_left * _entropy(left))
+    return prior - split_entropy > (np.log2(n_candidates) + delta) / n
+
+
+def mdl_cut_points(values, y, n_classes):
+    """Sorted MDL cut points of one feature; `y` holds class codes 0..n_classes-1."""
+    keep = ~np.isnan(values)
+    # ties may come out in any order: counts are only read at boundaries between distinct values
+    order = np.argsort(values[keep])
+    v, c = values[keep][order], y[keep][order]
+    n = len(v)
+    if n < 2:
+        return np.empty(0)
+    # pos: 0, every boundary between distinct values, n. A cut at pos[i] puts sorted rows
+    # [pos[a], pos[i]) left and [pos[i], pos[b]) right of a segment (a, b).
+    pos = np.concatenate([[0], np.flatnonzero(v[:-1] < v[1:]) + 1, [n]])
+    # class-major cumulative class counts at each position
+    cum = np.zeros((n_classes, len(pos)), dtype=np.intp)
+    for k in range(n_classes):
+        cum[k, 1:] = np.cumsum(c == k)[pos[1:] - 1]
+    # counts are whole numbers <= n, so x*log2(x) is a table lookup
+    xlog2x = _xlog2x(np.arange(n + 1, dtype=np.float64))
+
+    cuts = []
+    segments = [(0, len(pos) - 1)]
+    while segments:
+        a, b = segments.pop()
+        if b - a < 2:
+            continue
+        size = pos[b] - pos[a]
+        total = cum[:, b] - cum[:, a]
+        left = cum[:, a + 1:b] - cum[:, a:a + 1]
+        n_left = pos[a + 1:b] - pos[a]
+        # class entropy of both halves, weighted by their sizes, for every candidate at once
+        info = xlog2x[n_left] + xlog2x[size - n_left]
+        for k in range(n_classes):
+            info -= xlog2x[left[k]] + xlog2x[total[k] - left[k]]
+        best = int(np.argmin(info))
+        i = a + 1 + best
+        if _mdl_accepts(total, left[:, best], total - left[:, best], size, b - a - 1, info[best] / size):
+            cuts.append((v[pos[i] - 1] + v[pos[i]]) / 2.0)
+            segments += [(a, i), (i, b)]
+    return np.sort(np.array(cuts))
+
+
+class MDLDiscretizer(TransformerMixin, BaseEstimator):
+    """Supervised Fayyad-Irani MDL discretizer; transform returns ordinal bin codes (NaN stays NaN)."""
+
+    def fit(self, X, y):
+        X = np.asarray(X, dtype=np.float64)
+        self.classes_, codes = np.unique(np.asarray(y), return_inverse=True)
+        self.cut_points_ = [mdl_cut_points(X[:, j], codes, len(self.classes_)) for j in range(X.shape[1])]
+        self.n_features_in_ = X.shape[1]
+        return self
+
+    def transform(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        out = np.column_stack([np.searchsorted(cuts, X[:, j], side='left')
+                               for j, cuts in enumerate(self.cut_points_)]).astype(np.float64)
+        out[np.isnan(X)] = np.nan
+        return out
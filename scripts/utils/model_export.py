@@ -0,0 +1,57 @@
+"""
+Model Export
+Saves a fitted model together with its preprocessing (one sklearn Pipeline)
+and what a caller needs to build input rows for it: feature names and dtypes,
+the class labels, one example row and free-form metadata such as the CV
+score it was picked on.
+Bundles are plain joblib files under results/models/, one per model, and are
+what scripts/utils/inference_server.py serves.
+"""
+
+import glob
+import json
+import os
+
+import pandas as pd
+
+repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+MODELS_DIR = os.path.join(repo_root, 'results', 'models')
+EXT = '.joblib'
+
+
+def feature_dtypes(X):
+    """Numeric columns are served as float64 (JSON nulls become NaN), everything else as object."""
+    return {col: 'float64' if pd.api.types.is_numeric_dtype(dtype) else 'object' for col, dtype in X.dtypes.items()}
+
+
+def save_model(name, model, X, classes, meta=None, models_dir=MODELS_DIR):
+    """Write `model` (fitted on frames shaped like X) to <models_dir>/<name>.joblib; returns the path."""
+    import joblib
+
+    bundle = {'name': name, 'model': model, 'features': list(X.columns), 'dtypes': feature_dtypes(X),
+              'classes': [str(c) for c in classes], 'meta': meta or {},
+              'example': json.loads(X.iloc[[0]].to_json(orient='records'))[0]}
+    os.makedirs(models_dir, exist_ok=True)
+    path = os.path.join(models_dir, name + EXT)
+    tmp_path = path + '.tmp'
+    joblib.dump(bundle, tmp_path)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_model(path):
+    import joblib
+
+    return joblib.load(path)
+
+
+def list_models(models_dir=MODELS_DIR):
+    return sorted(glob.glob(os.path.join(models_dir, '*' + EXT)))
+
+
+def to_frame(bundle, rows):
+    """List of {feature: value} dicts -> DataFrame in the model's column order and dtypes."""
+    missing = {f for row in rows for f in bundle['features'] if f not in row}
+    if missing:
+        raise ValueError(f'missing features: {sorted(missing)}')
+    return pd.DataFrame(rows, columns=bundle['features']).astype(bundle['dtypes'])
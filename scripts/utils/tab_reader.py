@@ -0,0 +1,203 @@
+"""
+Orange .tab Reader
+Reads Orange's tab-delimited format in one pass, using its header to type the
+columns instead of coercing them afterwards:
+  - three-row header: names / type row (c, d, s, t or a space-separated list
+    of discrete values) / role row (class, meta, ignore, weight)
+  - one-row header with flag prefixes, e.g. `cD#origin` (C/D/S/T type,
+    c/m/i/w role)
+  - plain header (names only), where each column's type is inferred
+Continuous columns become floats ('?' and empty -> NaN), discrete columns become
+pandas categoricals, and each row must have exactly one field per column.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+TabColumn = namedtuple('TabColumn', ['name', 'kind', 'role', 'values'])
+
+TYPE_FLAGS = {'c': 'continuous', 'continuous': 'continuous', 'd': 'discrete', 'discrete': 'discrete',
+              's': 'string', 'string': 'string', 't': 'string', 'time': 'string', '': 'infer'}
+ROLE_FLAGS = {'': None, 'class': 'class', 'c': 'class', 'meta': 'meta', 'm': 'meta',
+              'ignore': 'ignore', 'i': 'ignore', 'weight': 'weight', 'w': 'weight'}
+MISSING = ('?', '', '~', 'nan', 'NA')
+
+
+def _split(line):
+    return line.rstrip('\r\n').split('\t')
+
+
+def _type_of(token):
+    token = token.strip()
+    if token.lower() in TYPE_FLAGS:
+        return TYPE_FLAGS[token.lower()], None
+    if ' ' in token:
+        return 'discrete', token.split()
+    return None, None
+
+
+def _flagged(name):
+    flags, _, name = name.partition('#')
+    kind = 'infer'
+    role = None
+    for ch in flags:
+        if ch in 'CDST':
+            kind = TYPE_FLAGS[ch.lower()]
+        elif ch in 'cmiw':
+            role = ROLE_FLAGS[ch]
+    return TabColumn(name, kind, role, None)
+
+
+def read_header(f):
+    """Consume the header lines; returns the list of TabColumn."""
+    names = _split(f.readline())
+    if any('#' in n for n in names):
+        return [_flagged(n) for n in names], 1
+    pos = f.tell()
+    types_line = f.readline()
+    types = [_type_of(t) for t in _split(types_line)]
+    if types_line and len(types) == len(names) and all(k is not None for k, _ in types):
+        roles = _split(f.readline())
+        roles += [''] * (len(names) - len(roles))
+        return [TabColumn(n, k, ROLE_FLAGS.get(r.strip().lower()), v)
+                for n, (k, v), r in zip(names, types, roles)], 3
+    f.seek(pos)
+    return [TabColumn(n, 'infer', None, None) for n in names], 1
+
+
+def _to_float(tokens, dtype):
+    tokens = np.char.strip(np.asarray(tokens, dtype=str))
+    missing = np.isin(tokens, MISSING)
+    out = np.full(len(tokens), np.nan, dtype=dtype)
+    out[~missing] = tokens[~missing].astype(dtype)
+    return out
+
+
+def _is_number(text):
+    try:
+        float(text)
+        return True
+    except ValueError:
+        return False
+
+
+def _categorical(codes, labels, declared=None):
+    """Codes in first-seen order -> Categorical with declared or naturally sorted categories."""
+    labels = list(labels)
+    if declared is not None:
+        order = list(declared) + sorted(set(labels) - set(declared))
+    elif labels and all(_is_number(v) for v in labels):
+        order = sorted(labels, key=float)
+    else:
+        order = sorted(labels)
+    if labels and all(_is_number(v) for v in order):
+        cats = [int(float(v)) if float(v).is_integer() else float(v) for v in order]
+    else:
+        cats = order
+    remap = np.array([order.index(v) for v in labels] + [-1], dtype=np.int32)
+    return pd.Categorical.from_codes(remap[codes], cats)
+
+
+def _row_chunks(f, path, n_cols, line_no, chunk_rows):
+    """Yield object arrays of at most chunk_rows validated rows."""
+    rows = []
+    for line in f:
+        line_no += 1
+        if not line.strip():
+            continue
+        fields = _split(line)
+        if len(fields) != n_cols:
+            raise ValueError(f'{path}:{line_no}: expected {n_cols} fields, got {len(fields)}')
+        rows.append(fields)
+        if len(rows) == chunk_rows:
+            yield np.array(rows, dtype=object)
+            rows = []
+    if rows:
+        yield np.array(rows, dtype=object)
+
+
+def _codes(tokens):
+    """Stripped tokens -> (codes into sorted labels, labels); missing -> -1."""
+    labels, codes = np.unique(np.where(np.isin(tokens, MISSING), '', tokens), return_inverse=True)
+    has_missing = len(labels) > 0 and labels[0] == ''
+    codes = np.where(labels[codes] == '', -1, codes - has_missing).astype(np.int32)
+    return codes, [l for l in labels if l != '']
+
+
+def _infer_kind(tokens):
+    present = tokens[~np.isin(tokens, MISSING)]
+    return 'continuous' if all(_is_number(t) for t in np.unique(present)) else 'discrete'
+
+
+def read_tab(path, chunk_rows=65536, continuous_dtype=np.float64):
+    """
+    Parse a .tab file into a DataFrame. Column roles (class/meta/...) are stored in
+    df.attrs['roles']; the class column is also in df.attrs['target'].
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        columns, header_rows = read_header(f)
+        parts = {c.name: [] for c in columns}
+        # discrete columns: label -> code in first-seen order, shared by all chunks
+        lookups = {c.name: {} for c in columns if c.kind == 'discrete'}
+        for grid in _row_chunks(f, path, len(columns), header_rows, chunk_rows):
+            for j, col in enumerate(columns):
+                tokens = grid[:, j]
+                if col.kind == 'continuous':
+                    parts[col.name].append(_to_float(tokens, continuous_dtype))
+                elif col.kind == 'discrete':
+                    lookup = lookups[col.name]
+                    uniq, inverse = np.unique(np.char.strip(tokens.astype(str)), return_inverse=True)
+                    mapped = np.array([-1 if u in MISSING else lookup.setdefault(u, len(lookup))
+                                       for u in uniq], dtype=np.int32)
+                    parts[col.name].append(mapped[inverse])
+                else:
+                    parts[col.name].append(tokens)
+
+    data = {}
+    for col in columns:
+        chunks = parts[col.name]
+        values = np.concatenate(chunks) if chunks else np.empty(0)
+        if col.kind == 'continuous':
+            data[col.name] = values
+        elif col.kind == 'discrete':
+            data[col.name] = _categorical(values, lookups[col.name], col.values)
+        elif col.kind == 'infer':
+            tokens = np.char.strip(values.astype(str))
+            if _infer_kind(tokens) == 'continuous':
+                data[col.name] = _to_float(tokens, continuous_dtype)
+            else:
+                data[col.name] = _categorical(*_codes(tokens))
+        else:
+            data[col.name] = values.astype(str)
+    df = pd.DataFrame(data)
+    df.attrs['roles'] = {c.name: c.role for c in columns if c.role}
+    targets = [c.name for c in columns if c.role == 'class']
+    df.attrs['target'] = targets[0] if targets else None
+    return df
+
+
+def iter_chunks(path, chunk_rows=65536, continuous_dtype=np.float64):
+    """
+    Yield the file as DataFrames of at most `chunk_rows` rows, holding one chunk
+    in memory at a time. Discrete columns are categoricals of the labels present
+    in the chunk; columns without a declared type are typed from the first chunk.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        columns, header_rows = read_header(f)
+        kinds = {}
+        for grid in _row_chunks(f, path, len(columns), header_rows, chunk_rows):
+            data = {}
+            for j, col in enumerate(columns):
+                tokens = np.char.strip(grid[:, j].astype(str))
+                kind = col.kind
+                if kind == 'infer':
+                    kind = kinds.setdefault(col.name, _infer_kind(tokens))
+                if kind == 'continuous':
+                    data[col.name] = _to_float(tokens, continuous_dtype)
+                elif kind == 'discrete':
+                    data[col.name] = _categorical(*_codes(tokens), col.values)
+                else:
+                    data[col.name] = tokens
+            yield pd.DataFrame(data)